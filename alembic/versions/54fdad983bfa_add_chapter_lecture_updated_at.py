@@ -0,0 +1,34 @@
+"""add chapter and lecture updated_at
+
+Revision ID: 54fdad983bfa
+Revises: e65aa6e6d05a
+Create Date: 2026-10-18 10:03:17.551962
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '54fdad983bfa'
+down_revision: Union[str, Sequence[str], None] = 'e65aa6e6d05a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chapters', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('lectures', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE chapters SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+    op.execute("UPDATE lectures SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('lectures') as batch_op:
+        batch_op.drop_column('updated_at')
+    with op.batch_alter_table('chapters') as batch_op:
+        batch_op.drop_column('updated_at')
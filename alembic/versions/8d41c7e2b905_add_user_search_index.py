@@ -0,0 +1,56 @@
+"""add user search index
+
+Revision ID: 8d41c7e2b905
+Revises: 54fdad983bfa
+Create Date: 2026-10-18 11:42:08.204417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41c7e2b905'
+down_revision: Union[str, Sequence[str], None] = '54fdad983bfa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # Standalone FTS5 table keyed by users.id, kept in sync by app/crud/user.py.
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+            "email, username, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO users_fts (rowid, email, username) "
+            "SELECT id, email, COALESCE(username, '') FROM users"
+        )
+    elif dialect == 'postgresql':
+        # CONCURRENTLY cannot run inside a transaction; build without locking out writes.
+        with op.get_context().autocommit_block():
+            op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_email_trgm "
+                "ON users USING gin (email gin_trgm_ops)"
+            )
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_users_username_trgm "
+                "ON users USING gin ((COALESCE(username, '')) gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS users_fts")
+    elif dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_username_trgm")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_users_email_trgm")
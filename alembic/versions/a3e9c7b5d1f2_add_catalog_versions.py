@@ -0,0 +1,34 @@
+"""add catalog versions
+
+Revision ID: a3e9c7b5d1f2
+Revises: f8b3d1e6a4c9
+Create Date: 2026-10-18 22:37:15.904126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e9c7b5d1f2'
+down_revision: Union[str, Sequence[str], None] = 'f8b3d1e6a4c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    catalog_versions = op.create_table(
+        'catalog_versions',
+        sa.Column('resource', sa.String(length=32), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('resource'),
+    )
+    op.bulk_insert(catalog_versions, [{'resource': resource} for resource in ('courses', 'chapters', 'lectures')])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalog_versions')
@@ -0,0 +1,136 @@
+"""add slug, enrollment and association keys
+
+Revision ID: a7c2e5f91d34
+Revises: f3b9a6d20c17
+Create Date: 2026-10-18 14:21:36.018452
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c2e5f91d34'
+down_revision: Union[str, Sequence[str], None] = 'f3b9a6d20c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_courses_slug', 'courses', ['slug'], True),
+    ('ix_chapters_slug', 'chapters', ['slug'], True),
+    ('ix_lectures_slug', 'lectures', ['slug'], True),
+    ('ix_chapters_course_id', 'chapters', ['course_id'], False),
+    ('ix_lectures_chapter_id', 'lectures', ['chapter_id'], False),
+    ('ix_user_registered_courses_user_course', 'user_registered_courses', ['user_id', 'course_id'], True),
+]
+
+ASSOCIATIONS = [
+    ('role_permission', 'pk_role_permission', ['role_id', 'permission_id']),
+    ('user_role', 'pk_user_role', ['user_id', 'role_id']),
+]
+
+
+def _dedup_slugs(table: str) -> None:
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        f"SELECT id, slug FROM {table} "
+        f"WHERE slug IS NOT NULL AND id NOT IN (SELECT MIN(id) FROM {table} GROUP BY slug) ORDER BY id"
+    )).all()
+    if not duplicates:
+        return
+    taken = set(bind.execute(sa.text(f"SELECT slug FROM {table} WHERE slug IS NOT NULL")).scalars())
+    for row_id, slug in duplicates:
+        candidate = f"{slug}-{row_id}"
+        counter = 2
+        while candidate in taken:
+            candidate = f"{slug}-{row_id}-{counter}"
+            counter += 1
+        taken.add(candidate)
+        bind.execute(sa.text(f"UPDATE {table} SET slug = :slug WHERE id = :id"), {"slug": candidate, "id": row_id})
+
+
+def _check_unique() -> None:
+    """
+    Fail before building the unique indexes if any duplicates are left.
+
+    A CONCURRENTLY build that hits a duplicate leaves an INVALID index behind on Postgres.
+    """
+    bind = op.get_bind()
+    for _, table, columns, unique in INDEXES:
+        if not unique:
+            continue
+        keys = ', '.join(columns)
+        duplicate = bind.execute(sa.text(
+            f"SELECT {keys} FROM {table} WHERE {' AND '.join(f'{c} IS NOT NULL' for c in columns)} "
+            f"GROUP BY {keys} HAVING COUNT(*) > 1"
+        )).first()
+        if duplicate is not None:
+            raise RuntimeError(f"{table} still has duplicate {keys} {tuple(duplicate)}; resolve them and rerun the migration")
+
+
+def _dedup() -> None:
+    """Make existing rows satisfy the new unique keys."""
+    dialect = op.get_bind().dialect.name
+
+    # Keep the oldest row of each slug as is and suffix the others with their id, adding a
+    # counter when that slug is already taken by another row.
+    for table in ('courses', 'chapters', 'lectures'):
+        _dedup_slugs(table)
+
+    op.execute(
+        "DELETE FROM user_registered_courses WHERE id NOT IN "
+        "(SELECT MIN(id) FROM user_registered_courses GROUP BY user_id, course_id)"
+    )
+
+    # Association tables have no id column; use the physical row id instead.
+    row_id = 'ctid' if dialect == 'postgresql' else 'rowid'
+    for table, _, columns in ASSOCIATIONS:
+        first, second = columns
+        op.execute(f"DELETE FROM {table} WHERE {first} IS NULL OR {second} IS NULL")
+        if dialect == 'postgresql':
+            op.execute(
+                f"DELETE FROM {table} a USING {table} b WHERE a.{row_id} > b.{row_id} "
+                f"AND a.{first} = b.{first} AND a.{second} = b.{second}"
+            )
+        else:
+            op.execute(
+                f"DELETE FROM {table} WHERE {row_id} NOT IN "
+                f"(SELECT MIN({row_id}) FROM {table} GROUP BY {first}, {second})"
+            )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _dedup()
+
+    for table, name, columns in ASSOCIATIONS:
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=sa.Integer(), nullable=False)
+            batch_op.create_primary_key(name, columns)
+
+    _check_unique()
+
+    if op.get_bind().dialect.name == 'postgresql':
+        # Build the indexes without blocking writes on large tables.
+        with op.get_context().autocommit_block():
+            for name, table, columns, unique in INDEXES:
+                op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns, unique in INDEXES:
+            op.create_index(name, table, columns, unique=unique, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
+
+    for table, name, columns in reversed(ASSOCIATIONS):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(name, type_='primary')
+            for column in columns:
+                batch_op.alter_column(column, existing_type=sa.Integer(), nullable=True)
@@ -0,0 +1,69 @@
+"""add lecture course_id
+
+Revision ID: b4e81d6c2f57
+Revises: a7c2e5f91d34
+Create Date: 2026-10-18 16:02:11.530274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e81d6c2f57'
+down_revision: Union[str, Sequence[str], None] = 'a7c2e5f91d34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 5000
+
+
+def _backfill() -> None:
+    """Copy chapters.course_id onto lectures in id ranges, so no statement touches the whole table."""
+    bind = op.get_bind()
+    first, last = bind.execute(sa.text("SELECT MIN(id), MAX(id) FROM lectures")).first()
+    if first is None:
+        return
+    for start in range(first, last + 1, BATCH_SIZE):
+        bind.execute(
+            sa.text(
+                "UPDATE lectures SET course_id = "
+                "(SELECT chapters.course_id FROM chapters WHERE chapters.id = lectures.chapter_id) "
+                "WHERE id >= :start AND id < :end"
+            ),
+            {"start": start, "end": start + BATCH_SIZE},
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.add_column('lectures', sa.Column('course_id', sa.Integer(), nullable=True))
+        # Commit every batch and build the index and foreign key without blocking writes.
+        with op.get_context().autocommit_block():
+            _backfill()
+            op.create_index(
+                'ix_lectures_course_id', 'lectures', ['course_id'], postgresql_concurrently=True, if_not_exists=True
+            )
+            op.execute(
+                "ALTER TABLE lectures ADD CONSTRAINT fk_lectures_course_id_courses "
+                "FOREIGN KEY (course_id) REFERENCES courses (id) NOT VALID"
+            )
+            op.execute("ALTER TABLE lectures VALIDATE CONSTRAINT fk_lectures_course_id_courses")
+    else:
+        with op.batch_alter_table('lectures') as batch_op:
+            batch_op.add_column(sa.Column('course_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_lectures_course_id_courses', 'courses', ['course_id'], ['id'])
+            batch_op.create_index('ix_lectures_course_id', ['course_id'])
+        _backfill()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('lectures') as batch_op:
+        batch_op.drop_index('ix_lectures_course_id')
+        batch_op.drop_constraint('fk_lectures_course_id_courses', type_='foreignkey')
+        batch_op.drop_column('course_id')
@@ -0,0 +1,33 @@
+"""make otp email unique
+
+Revision ID: c9d3f7a1e6b2
+Revises: b4e81d6c2f57
+Create Date: 2026-10-18 17:40:52.118906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d3f7a1e6b2'
+down_revision: Union[str, Sequence[str], None] = 'b4e81d6c2f57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Codes are only valid for minutes, so expired rows carry nothing worth keeping; only
+    # the newest code of each address can still be used.
+    op.execute("DELETE FROM otp_codes WHERE id NOT IN (SELECT MAX(id) FROM otp_codes GROUP BY email)")
+
+    op.drop_index('ix_otp_codes_email', table_name='otp_codes')
+    op.create_index('ix_otp_codes_email', 'otp_codes', ['email'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_otp_codes_email', table_name='otp_codes')
+    op.create_index('ix_otp_codes_email', 'otp_codes', ['email'], unique=False)
@@ -0,0 +1,38 @@
+"""add otp challenge_id
+
+Revision ID: d2a6b8c4e913
+Revises: c9d3f7a1e6b2
+Create Date: 2026-10-18 18:25:37.640215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6b8c4e913'
+down_revision: Union[str, Sequence[str], None] = 'c9d3f7a1e6b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Pending codes were issued with their signup details in the client's session cookie;
+    # they have no challenge to redeem against and expire within minutes anyway.
+    op.execute("DELETE FROM otp_codes")
+
+    with op.batch_alter_table('otp_codes') as batch_op:
+        batch_op.add_column(sa.Column('challenge_id', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('data', sa.Text(), nullable=True))
+        batch_op.create_index('ix_otp_codes_challenge_id', ['challenge_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('otp_codes') as batch_op:
+        batch_op.drop_index('ix_otp_codes_challenge_id')
+        batch_op.drop_column('data')
+        batch_op.drop_column('challenge_id')
@@ -0,0 +1,65 @@
+"""add catalog search index
+
+Revision ID: f3b9a6d20c17
+Revises: 8d41c7e2b905
+Create Date: 2026-10-18 13:05:51.730264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9a6d20c17'
+down_revision: Union[str, Sequence[str], None] = '8d41c7e2b905'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # Standalone FTS5 tables keyed by the content table ids, kept in sync by app/crud/search.py.
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5("
+            "title, full_name, description, lecturer, language, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS lectures_fts USING fts5("
+            "title, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO courses_fts (rowid, title, full_name, description, lecturer, language) "
+            "SELECT id, COALESCE(title, ''), COALESCE(full_name, ''), COALESCE(description, ''), "
+            "COALESCE(lecturer, ''), COALESCE(language, '') FROM courses"
+        )
+        op.execute("INSERT INTO lectures_fts (rowid, title) SELECT id, COALESCE(title, '') FROM lectures")
+    elif dialect == 'postgresql':
+        # Expressions must match COURSE_DOCUMENT / LECTURE_DOCUMENT in app/crud/search.py.
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_courses_search ON courses USING gin ("
+                "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(full_name, '') || ' ' || "
+                "coalesce(description, '') || ' ' || coalesce(lecturer, '') || ' ' || "
+                "coalesce(language, '')))"
+            )
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_lectures_search ON lectures USING gin ("
+                "to_tsvector('simple', coalesce(title, '')))"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS lectures_fts")
+        op.execute("DROP TABLE IF EXISTS courses_fts")
+    elif dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_lectures_search")
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_courses_search")
@@ -0,0 +1,29 @@
+"""add user enrollment_version
+
+Revision ID: f8b3d1e6a4c9
+Revises: e5c1f8a2d7b4
+Create Date: 2026-10-18 21:04:52.318847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8b3d1e6a4c9'
+down_revision: Union[str, Sequence[str], None] = 'e5c1f8a2d7b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('enrollment_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('enrollment_version')
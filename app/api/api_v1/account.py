@@ -1,13 +1,19 @@
-from fastapi import Depends, APIRouter, status, HTTPException, Request
+from fastapi import Depends, APIRouter, status, HTTPException, Header, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.api import deps
-from app.schemas.account import SignUp, Register, Login, CreateUserRegisteredCourse, UserRegisteredCourseOut
+from app.schemas.account import (
+    SignUp, Register, Login, CreateUserRegisteredCourse, UserRegisteredCourseOut,
+    BulkRegisterCourse, BulkRegisterCourseOut,
+)
 from app.services import token_management_service as Token
 from app.services import hash_password
+from app.services import idempotency, metrics
+from app.services.otp_store import OtpCheck, otp_store
 from app.crud import account as AccountCrud
+from app.crud import user as UserCrud
 from app.models.user import User
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_current_principal, has_permission, Principal
 import random
 
 router = APIRouter()
@@ -21,51 +27,43 @@ def signup(request: Request, payload: SignUp, db: Session = Depends(deps.get_db)
     code = str(random.randint(100000, 999999))
     print(f"OTP code for {payload.email}: {code}")
 
-    existing_otp = AccountCrud.get_otp_by_email(db, payload.email)
-    if existing_otp:
-        AccountCrud.delete_otp(db, existing_otp)
-    AccountCrud.create_otp(db, payload.email, code)
-
-    request.session['signup_data'] = {
-        "email": payload.email,
+    # The pending signup stays server-side with the challenge; only its id reaches the client.
+    challenge_id = otp_store.issue(payload.email, code, {
         "username": payload.username,
-        "password": payload.password
-    }
+        "hashed_password": hash_password.hasher.bcrypt(payload.password),
+    })
+    metrics.OTP_ISSUED.inc()
+
+    request.session["signup_challenge"] = challenge_id
 
-    return {"message": "OTP sent successfully."}
+    return {"message": "OTP sent successfully.", "challenge_id": challenge_id}
 
 
 @router.post("/register", status_code=200, tags=["Accounts"])
 def register(request: Request, payload: Register, db: Session = Depends(deps.get_db)):
-    signup_data = request.session.get("signup_data")
-    if not signup_data or signup_data.get("email") != payload.email:
-        raise HTTPException(status_code=400, detail="Signup session data not found or mismatch")
+    challenge_id = payload.challenge_id or request.session.get("signup_challenge")
+    if not challenge_id:
+        raise HTTPException(status_code=400, detail="Signup challenge not found.")
 
-    otp_record = AccountCrud.get_otp_by_email(db, payload.email)
-    if not otp_record:
+    result = otp_store.consume(challenge_id, payload.email, payload.code)
+    if result.check == OtpCheck.MISSING:
         raise HTTPException(status_code=404, detail="OTP code not found.")
-    if otp_record.code != payload.code:
+    if result.check == OtpCheck.MISMATCH:
         raise HTTPException(status_code=400, detail="Incorrect OTP code.")
-    if AccountCrud.is_otp_expired(otp_record):
+    if result.check == OtpCheck.EXPIRED:
         raise HTTPException(status_code=400, detail="OTP code has expired.")
 
-    AccountCrud.delete_otp(db, otp_record)
-
-    signup_data['password'] = hash_password.Hash().bcrypt(password=signup_data['password'])
-
-    user = User(
-        email=signup_data["email"],
-        username=signup_data["username"],
-        password=signup_data["password"],
+    user = UserCrud.create_user(
+        db,
+        email=result.email,
+        username=result.data["username"],
+        hashed_password=result.data["hashed_password"],
         is_registered=True
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
 
-    request.session.pop("signup_data", None)
+    request.session.pop("signup_challenge", None)
 
-    token = Token.create_access_token(data={"sub": user.email})
+    token = Token.create_user_access_token(db, user)
 
     return {"message": "User registered successfully.", "user_id": user.id, "token": token}
 
@@ -76,10 +74,10 @@ def login(payload: Login, db: Session = Depends(deps.get_db)):
     if not user:
         raise HTTPException(status_code=404, detail="User with this email not found.")
 
-    if not hash_password.Hash().verify(payload.password, user.password):
+    if not hash_password.hasher.verify(payload.password, user.password):
         return HTTPException(status_code=400, detail="Password was incorrect.")
     
-    token = Token.create_access_token(data={"sub": user.email})
+    token = Token.create_user_access_token(db, user)
 
     return {"message": "User logged in successfully.", "user_id": user.id, "token": token}
 
@@ -98,26 +96,52 @@ def get_current_user_info(current_user: User = Depends(get_current_user)):
 @router.post("/register-course", status_code=status.HTTP_201_CREATED, response_model=UserRegisteredCourseOut, tags=["Course Registration"])
 def register_course(
     payload: CreateUserRegisteredCourse,
-    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(deps.get_db)
 ):
-    """Register current user for a course"""
-    registered_course = AccountCrud.create_user_registered_course(
-        db, current_user.id, payload.course_id
-    )
-    
-    if not registered_course:
-        raise HTTPException(
-            status_code=400, 
-            detail="User is already registered for this course"
+    """Register current user for a course; retries sending the same Idempotency-Key get the first response back"""
+    def enroll():
+        registered_course = AccountCrud.create_user_registered_course(
+            db, current_user.id, payload.course_id
         )
-    
-    return registered_course
+        if registered_course == AccountCrud.COURSE_NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Course not found")
+        if not registered_course:
+            raise HTTPException(
+                status_code=400, 
+                detail="User is already registered for this course"
+            )
+        return UserRegisteredCourseOut.model_validate(registered_course, from_attributes=True)
+
+    return idempotency.run(
+        f"{current_user.id}:register-course", idempotency_key, payload, status.HTTP_201_CREATED, enroll
+    )
+
+
+@router.post("/register-course/bulk", status_code=status.HTTP_201_CREATED, response_model=BulkRegisterCourseOut, tags=["Course Registration"])
+def register_users_for_course(
+    payload: BulkRegisterCourse,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_user: Principal = Depends(has_permission("manage_courses")),
+    db: Session = Depends(deps.get_db)
+):
+    """Register many users for a course; users already registered or not found are skipped"""
+    def enroll():
+        registered = AccountCrud.create_user_registered_courses(db, payload.course_id, payload.user_ids)
+        if registered == AccountCrud.COURSE_NOT_FOUND:
+            raise HTTPException(status_code=404, detail="Course not found")
+        skipped = sorted(set(payload.user_ids) - set(registered))
+        return BulkRegisterCourseOut(course_id=payload.course_id, registered=registered, skipped=skipped)
+
+    return idempotency.run(
+        f"{current_user.id}:register-course/bulk", idempotency_key, payload, status.HTTP_201_CREATED, enroll
+    )
 
 
 @router.get("/registered-courses", response_model=List[UserRegisteredCourseOut], tags=["Course Registration"])
 def get_registered_courses(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(deps.get_db)
 ):
     """Get all courses registered by current user"""
@@ -128,7 +152,7 @@ def get_registered_courses(
 @router.get("/registered-courses/{course_id}", response_model=UserRegisteredCourseOut, tags=["Course Registration"])
 def get_registered_course(
     course_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(deps.get_db)
 ):
     """Get specific registered course for current user"""
@@ -145,7 +169,7 @@ def get_registered_course(
 @router.delete("/unregister-course/{course_id}", status_code=status.HTTP_200_OK, tags=["Course Registration"])
 def unregister_course(
     course_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(deps.get_db)
 ):
     """Unregister current user from a course"""
@@ -0,0 +1,131 @@
+from fastapi import APIRouter, status, Depends, HTTPException, Request, Response, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api import deps, conditional
+from app.services import catalog_cache, enrollment_cache, pagination
+from app.schemas.learning import RetrieveCourse, RetrieveChapter, RetrieveLecture, CourseTree
+import app.crud.async_catalog as catalogCrud
+from typing import List, Literal, Optional
+from app.dependencies import get_current_principal_async, get_current_user_async, Principal
+from app.db.query_stats import query_budget
+from app.models.user import User
+
+# Async versions of the hot read endpoints. When USE_ASYNC_DB is enabled this router is
+# included before the sync routers, so these routes take precedence over their `def`
+# counterparts; writes keep going through the sync routers.
+router = APIRouter()
+
+@router.get("/courses", response_model=List[RetrieveCourse], status_code=status.HTTP_200_OK, tags=["Courses"])
+async def courses(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    sort: Literal["id", "updated"] = Query("id"),
+    db: AsyncSession = Depends(deps.get_async_db)
+):
+    """Get list of all courses, or one page of them when `limit` or `cursor` is given"""
+    if limit is not None or cursor is not None:
+        items, next_cursor = await catalogCrud.get_courses_page(db, limit or pagination.DEFAULT_PAGE_SIZE, cursor, sort)
+        return pagination.page_response(request, catalog_cache.dump_models(RetrieveCourse, items), next_cursor)
+
+    entry = await catalog_cache.get_or_build_async(db, "courses", RetrieveCourse, lambda: catalogCrud.get_all_courses(db))
+    return conditional.json_response(request, entry.body, entry.etag)
+
+
+@router.get("/courses/{slug}", response_model=RetrieveCourse, status_code=status.HTTP_200_OK, tags=["Courses"])
+@query_budget(2)
+async def retrive_course(slug: str, request: Request, response: Response, db: AsyncSession = Depends(deps.get_async_db)):
+    """Retrieve a specific course by slug"""
+    version = await catalogCrud.get_course_version(db, slug)
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course with this slug not found.")
+    etag = conditional.make_etag("course", *version)
+    if conditional.is_not_modified(request, etag, version.updated_at):
+        return conditional.not_modified(etag, version.updated_at)
+
+    course = await catalogCrud.get_course_by_slug(db, slug)
+    conditional.set_validators(response, etag, version.updated_at)
+    return course
+
+
+@router.get("/courses/{slug}/tree", response_model=CourseTree, status_code=status.HTTP_200_OK, tags=["Courses"])
+@query_budget(4)
+async def get_course_tree(slug: str, request: Request, response: Response, db: AsyncSession = Depends(deps.get_async_db)):
+    """Get a course with all of its chapters and lectures in one response"""
+    version = await catalogCrud.get_course_tree_version(db, slug)
+    if not version:
+        raise HTTPException(status_code=404, detail="Course with this slug not found.")
+    etag = conditional.make_etag("course-tree", *version)
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+
+    tree = await catalogCrud.get_course_tree(db, slug)
+    if tree is None:
+        raise HTTPException(status_code=404, detail="Course with this slug not found.")
+    conditional.set_validators(response, etag)
+    return tree
+
+
+@router.get("/chapters", response_model=List[RetrieveChapter], status_code=status.HTTP_200_OK, tags=["Chapters"])
+async def chapters(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    sort: Literal["id", "updated"] = Query("id"),
+    db: AsyncSession = Depends(deps.get_async_db)
+):
+    """Get list of all chapters, or one page of them when `limit` or `cursor` is given"""
+    if limit is not None or cursor is not None:
+        items, next_cursor = await catalogCrud.get_chapters_page(db, limit or pagination.DEFAULT_PAGE_SIZE, cursor, sort)
+        return pagination.page_response(request, catalog_cache.dump_models(RetrieveChapter, items), next_cursor)
+
+    entry = await catalog_cache.get_or_build_async(db, "chapters", RetrieveChapter, lambda: catalogCrud.get_all_chapters(db))
+    return conditional.json_response(request, entry.body, entry.etag)
+
+
+@router.get("/lectures", response_model=List[RetrieveLecture], tags=["Lectures"])
+async def get_lectures(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    sort: Literal["id", "updated"] = Query("id"),
+    db: AsyncSession = Depends(deps.get_async_db)
+):
+    """Get list of all lectures, or one page of them when `limit` or `cursor` is given"""
+    if limit is not None or cursor is not None:
+        items, next_cursor = await catalogCrud.get_lectures_page(db, limit or pagination.DEFAULT_PAGE_SIZE, cursor, sort)
+        return pagination.page_response(request, catalog_cache.dump_models(RetrieveLecture, items), next_cursor)
+
+    entry = await catalog_cache.get_or_build_async(db, "lectures", RetrieveLecture, lambda: catalogCrud.get_all_lectures(db))
+    return conditional.json_response(request, entry.body, entry.etag)
+
+
+@router.get("/lectures/{slug}", response_model=RetrieveLecture, tags=["Lectures"])
+@query_budget(6)
+async def get_lecture(slug: str, request: Request, response: Response, db: AsyncSession = Depends(deps.get_async_db), current_user: Principal = Depends(get_current_principal_async)):
+    """Retrieve a specific lecture by slug"""
+    info = await catalogCrud.get_lecture_access_info(db, slug)
+    if not info:
+        raise HTTPException(status_code=404, detail="Lecture not found")
+
+    if not info.is_free:
+        if not await enrollment_cache.is_enrolled_async(db, current_user.id, info.course_id):
+            raise HTTPException(status_code=403, detail="You must be enrolled in this course to access this lecture")
+
+    etag = conditional.make_etag("lecture", info.id, info.updated_at)
+    if conditional.is_not_modified(request, etag, info.updated_at):
+        return conditional.not_modified(etag, info.updated_at)
+
+    lecture = await catalogCrud.get_lecture_by_slug(db, slug)
+    conditional.set_validators(response, etag, info.updated_at)
+    return lecture
+
+
+@router.get("/accounts/current-user", tags=["Accounts"])
+@query_budget(1)
+async def get_current_user_info(current_user: User = Depends(get_current_user_async)):
+    return {
+        "user_id": current_user.id,
+        "email": current_user.email,
+        "username": current_user.username,
+        "is_registered": current_user.is_registered
+    }
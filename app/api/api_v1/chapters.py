@@ -1,23 +1,39 @@
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Request, Response, Query
 from sqlalchemy.orm import Session
-from app.api import deps
-from app.models.user import User
+from app.api import deps, conditional
+from app.services import catalog_cache, pagination
 from app.schemas.learning import RetrieveChapter, CreateChapter, UpdateChapter, RetrieveLecture
 import app.crud.chapters as chaptersCrud
-from typing import List
-from app.dependencies import has_permission
+from typing import List, Literal, Optional
+from app.dependencies import has_permission, Principal
+from app.db.query_stats import query_budget
 
 router = APIRouter()
 
 @router.get("/chapters", response_model=List[RetrieveChapter], status_code=status.HTTP_200_OK, tags=["Chapters"])
-def chapters(db: Session = Depends(deps.get_db)):
-    """Get list of all chapters"""
-    return chaptersCrud.get_all_chapters(db)
+def chapters(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    sort: Literal["id", "updated"] = Query("id"),
+    db: Session = Depends(deps.get_db),
+    read_db: Session = Depends(deps.get_read_db)
+):
+    """Get list of all chapters, or one page of them when `limit` or `cursor` is given"""
+    if limit is not None or cursor is not None:
+        items, next_cursor = chaptersCrud.get_chapters_page(read_db, limit or pagination.DEFAULT_PAGE_SIZE, cursor, sort)
+        return pagination.page_response(request, catalog_cache.dump_models(RetrieveChapter, items), next_cursor)
+
+    # Cache misses are rebuilt on the primary so a lagging replica never gets cached as the new version.
+    entry = catalog_cache.get_or_build(db, "chapters", RetrieveChapter, lambda: chaptersCrud.get_all_chapters(db))
+    return conditional.json_response(request, entry.body, entry.etag)
 
 
 @router.post("/chapters", response_model=RetrieveChapter, status_code=status.HTTP_201_CREATED, tags=["Chapters"])
-def create_chapter(payload: CreateChapter, db: Session = Depends(deps.get_db), current_user: User = Depends(has_permission("manage_chapters"))):
+def create_chapter(payload: CreateChapter, db: Session = Depends(deps.get_db), current_user: Principal = Depends(has_permission("manage_chapters"))):
     """Create a new chapter"""
+    if chaptersCrud.get_chapter_by_slug(db, payload.slug):
+        raise HTTPException(status_code=400, detail="Chapter with this slug already exists.")
     chapter = chaptersCrud.create_chapter(db, payload)
     if not chapter:
         raise HTTPException(status_code=404, detail="Course with this slug not found.")
@@ -25,17 +41,26 @@ def create_chapter(payload: CreateChapter, db: Session = Depends(deps.get_db), c
 
 
 @router.get('/chapters/{slug}', response_model=RetrieveChapter, status_code=status.HTTP_200_OK, tags=["Chapters"])
-def get_chapter(slug, db: Session = Depends(deps.get_db)):
+@query_budget(2)
+def get_chapter(slug, request: Request, response: Response, db: Session = Depends(deps.get_read_db)):
     """Retrieve a specific chapter by slug"""
-    chapter = chaptersCrud.get_chapter_by_slug(db, slug)
-    if not chapter:
+    version = chaptersCrud.get_chapter_version(db, slug)
+    if not version:
         raise HTTPException(status_code=404, detail="Chapter with this slug not found.")
+    etag = conditional.make_etag("chapter", *version)
+    if conditional.is_not_modified(request, etag, version.updated_at):
+        return conditional.not_modified(etag, version.updated_at)
+
+    chapter = chaptersCrud.get_chapter_by_slug(db, slug)
+    conditional.set_validators(response, etag, version.updated_at)
     return chapter
 
 
 @router.patch("/chapters/{slug}", response_model=RetrieveChapter, status_code=status.HTTP_200_OK, tags=["Chapters"])
-def update_chapter(slug: str, payload: UpdateChapter, db: Session = Depends(deps.get_db), current_user: User = Depends(has_permission("manage_chapters"))):
+def update_chapter(slug: str, payload: UpdateChapter, db: Session = Depends(deps.get_db), current_user: Principal = Depends(has_permission("manage_chapters"))):
     """Update a chapter's information"""
+    if payload.slug and payload.slug != slug and chaptersCrud.get_chapter_by_slug(db, payload.slug):
+        raise HTTPException(status_code=400, detail="Chapter with this slug already exists.")
     chapter = chaptersCrud.update_chapter(db, slug, payload)
     if not chapter:
         raise HTTPException(status_code=404, detail="Chapter with this slug not found.")
@@ -45,7 +70,7 @@ def update_chapter(slug: str, payload: UpdateChapter, db: Session = Depends(deps
 
 
 @router.delete("/chapters/{slug}", status_code=status.HTTP_200_OK, tags=["Chapters"])
-def delete_chapter(slug: str, db: Session = Depends(deps.get_db), current_user: User = Depends(has_permission("manage_chapters"))):
+def delete_chapter(slug: str, db: Session = Depends(deps.get_db), current_user: Principal = Depends(has_permission("manage_chapters"))):
     """Delete a chapter"""
     result = chaptersCrud.delete_chapter(db, slug)
     if not result:
@@ -54,9 +79,18 @@ def delete_chapter(slug: str, db: Session = Depends(deps.get_db), current_user:
 
 
 @router.get("/chapters/{slug}/lectures", response_model=List[RetrieveLecture], status_code=status.HTTP_200_OK, tags=["Lectures"])
-def get_chapter_lectures(slug: str, db: Session = Depends(deps.get_db)):
+@query_budget(3)
+def get_chapter_lectures(slug: str, request: Request, response: Response, db: Session = Depends(deps.get_read_db)):
     """Get all lectures for a specific chapter"""
+    version = chaptersCrud.get_chapter_lectures_version(db, slug)
+    if not version:
+        raise HTTPException(status_code=404, detail="Chapter with this slug not found.")
+    etag = conditional.make_etag("chapter-lectures", *version)
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+
     lectures = chaptersCrud.get_chapter_lectures(db, slug)
     if lectures is None:
         raise HTTPException(status_code=404, detail="Chapter with this slug not found.")
+    conditional.set_validators(response, etag)
     return lectures
\ No newline at end of file
@@ -1,42 +1,67 @@
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Request, Response, Query
 from sqlalchemy.orm import Session
-from app.api import deps
-from app.schemas.learning import CreateCourse, RetrieveCourse, UpdateCourse, RetrieveChapter
-from app.models.user import User
+from app.api import deps, conditional
+from app.services import catalog_cache, pagination
+from app.schemas.learning import CreateCourse, RetrieveCourse, UpdateCourse, RetrieveChapter, CourseTree
 import app.crud.courses as coursesCrud
-from typing import List
-from app.dependencies import has_permission
+from typing import List, Literal, Optional
+from app.dependencies import has_permission, Principal
+from app.db.query_stats import query_budget
 
 router = APIRouter()
 
 @router.get("/courses", response_model=List[RetrieveCourse], status_code=status.HTTP_200_OK, tags=["Courses"])
-def courses(db: Session = Depends(deps.get_db)):
-    """Get list of all courses"""
-    return coursesCrud.get_all_courses(db)
+def courses(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    sort: Literal["id", "updated"] = Query("id"),
+    db: Session = Depends(deps.get_db),
+    read_db: Session = Depends(deps.get_read_db)
+):
+    """Get list of all courses, or one page of them when `limit` or `cursor` is given"""
+    if limit is not None or cursor is not None:
+        items, next_cursor = coursesCrud.get_courses_page(read_db, limit or pagination.DEFAULT_PAGE_SIZE, cursor, sort)
+        return pagination.page_response(request, catalog_cache.dump_models(RetrieveCourse, items), next_cursor)
+
+    # Cache misses are rebuilt on the primary so a lagging replica never gets cached as the new version.
+    entry = catalog_cache.get_or_build(db, "courses", RetrieveCourse, lambda: coursesCrud.get_all_courses(db))
+    return conditional.json_response(request, entry.body, entry.etag)
 
 
 @router.post("/courses", response_model=RetrieveCourse, status_code=status.HTTP_201_CREATED, tags=["Courses"])
-def create_course(payload: CreateCourse, db: Session = Depends(deps.get_db), current_user: User = Depends(has_permission("manage_courses"))):
+def create_course(payload: CreateCourse, db: Session = Depends(deps.get_db), current_user: Principal = Depends(has_permission("manage_courses"))):
     """Create a new course"""
     existing_course = coursesCrud.get_course_by_title(db, payload.title)
     if existing_course:
         raise HTTPException(status_code=400, detail="Course with this title already exists.")
+    if coursesCrud.get_course_by_slug(db, payload.slug):
+        raise HTTPException(status_code=400, detail="Course with this slug already exists.")
 
     return coursesCrud.create_course(db, payload)
 
 
 @router.get("/courses/{slug}", response_model=RetrieveCourse, status_code=status.HTTP_200_OK, tags=["Courses"])
-def retrive_course(slug: str, db: Session = Depends(deps.get_db)):
+@query_budget(2)
+def retrive_course(slug: str, request: Request, response: Response, db: Session = Depends(deps.get_read_db)):
     """Retrieve a specific course by slug"""
-    course = coursesCrud.get_course_by_slug(db, slug)
-    if not course:
+    version = coursesCrud.get_course_version(db, slug)
+    if not version:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course with this slug not found.")
+    etag = conditional.make_etag("course", *version)
+    if conditional.is_not_modified(request, etag, version.updated_at):
+        return conditional.not_modified(etag, version.updated_at)
+
+    course = coursesCrud.get_course_by_slug(db, slug)
+    conditional.set_validators(response, etag, version.updated_at)
     return course
 
 
 @router.patch("/courses/{slug}")
-def update_course(slug: str, payload: UpdateCourse, db: Session = Depends(deps.get_db), current_user: User = Depends(has_permission("manage_courses"))):
+def update_course(slug: str, payload: UpdateCourse, db: Session = Depends(deps.get_db), current_user: Principal = Depends(has_permission("manage_courses"))):
     """Update a course's information"""
+    if payload.slug and payload.slug != slug and coursesCrud.get_course_by_slug(db, payload.slug):
+        raise HTTPException(status_code=400, detail="Course with this slug already exists.")
     course = coursesCrud.update_course(db, slug, payload)
     if not course:
         raise HTTPException(status_code=404, detail="Course with this slug not found.")
@@ -44,7 +69,7 @@ def update_course(slug: str, payload: UpdateCourse, db: Session = Depends(deps.g
 
 
 @router.delete("/courses/{slug}")
-def delete_course(slug: str, db: Session = Depends(deps.get_db), current_user: User = Depends(has_permission("manage_courses"))):
+def delete_course(slug: str, db: Session = Depends(deps.get_db), current_user: Principal = Depends(has_permission("manage_courses"))):
     """Delete a course"""
     result = coursesCrud.delete_course(db, slug)
     if not result:
@@ -53,9 +78,36 @@ def delete_course(slug: str, db: Session = Depends(deps.get_db), current_user: U
 
 
 @router.get("/courses/{slug}/chapters", response_model=List[RetrieveChapter], status_code=status.HTTP_200_OK, tags=["Courses"])
-def get_course_chapters(slug: str, db: Session = Depends(deps.get_db)):
+@query_budget(3)
+def get_course_chapters(slug: str, request: Request, response: Response, db: Session = Depends(deps.get_read_db)):
     """Get all chapters for a specific course"""
+    version = coursesCrud.get_course_chapters_version(db, slug)
+    if not version:
+        raise HTTPException(status_code=404, detail="Course with this slug not found.")
+    etag = conditional.make_etag("course-chapters", *version)
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+
     chapters = coursesCrud.get_course_chapters(db, slug)
     if chapters is None:
         raise HTTPException(status_code=404, detail="Course with this slug not found.")
-    return chapters
\ No newline at end of file
+    conditional.set_validators(response, etag)
+    return chapters
+
+
+@router.get("/courses/{slug}/tree", response_model=CourseTree, status_code=status.HTTP_200_OK, tags=["Courses"])
+@query_budget(4)
+def get_course_tree(slug: str, request: Request, response: Response, db: Session = Depends(deps.get_read_db)):
+    """Get a course with all of its chapters and lectures in one response"""
+    version = coursesCrud.get_course_tree_version(db, slug)
+    if not version:
+        raise HTTPException(status_code=404, detail="Course with this slug not found.")
+    etag = conditional.make_etag("course-tree", *version)
+    if conditional.is_not_modified(request, etag):
+        return conditional.not_modified(etag)
+
+    tree = coursesCrud.get_course_tree(db, slug)
+    if tree is None:
+        raise HTTPException(status_code=404, detail="Course with this slug not found.")
+    conditional.set_validators(response, etag)
+    return tree
\ No newline at end of file
@@ -1,43 +1,82 @@
-from fastapi import APIRouter, status, Depends, HTTPException
+from fastapi import APIRouter, status, Depends, HTTPException, Request, Response, Query
 from sqlalchemy.orm import Session
-from app.api import deps
-from app.schemas.learning import CreateLecture, UpdateLecture, RetrieveLecture
+from app.api import deps, conditional
+from app.services import catalog_cache, enrollment_cache, pagination
+from app.schemas.learning import CreateLecture, UpdateLecture, RetrieveLecture, LectureAccessRequest, LectureAccess
 import app.crud.lectures as lecturesCrud
-import app.crud.account as AccountCrud
-from typing import List
-from app.dependencies import has_permission, get_current_user
-from app.models.user import User
+from typing import List, Literal, Optional
+from app.dependencies import has_permission, get_current_principal, Principal
+from app.db.query_stats import query_budget
 
 router = APIRouter()
 
 @router.get("/lectures", response_model=List[RetrieveLecture])
-def get_lectures(db: Session = Depends(deps.get_db)):
-    """Get list of all lectures"""
-    return lecturesCrud.get_all_lectures(db)
+def get_lectures(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
+    sort: Literal["id", "updated"] = Query("id"),
+    db: Session = Depends(deps.get_db),
+    read_db: Session = Depends(deps.get_read_db)
+):
+    """Get list of all lectures, or one page of them when `limit` or `cursor` is given"""
+    if limit is not None or cursor is not None:
+        items, next_cursor = lecturesCrud.get_lectures_page(read_db, limit or pagination.DEFAULT_PAGE_SIZE, cursor, sort)
+        return pagination.page_response(request, catalog_cache.dump_models(RetrieveLecture, items), next_cursor)
+
+    # Cache misses are rebuilt on the primary so a lagging replica never gets cached as the new version.
+    entry = catalog_cache.get_or_build(db, "lectures", RetrieveLecture, lambda: lecturesCrud.get_all_lectures(db))
+    return conditional.json_response(request, entry.body, entry.etag)
 
 
 @router.get("/lectures/{slug}", response_model=RetrieveLecture)
-def get_lecture(slug: str, db: Session = Depends(deps.get_db), current_user: User = Depends(get_current_user)):
+@query_budget(6)
+def get_lecture(slug: str, request: Request, response: Response, db: Session = Depends(deps.get_read_db), current_user: Principal = Depends(get_current_principal)):
     """Retrieve a specific lecture by slug"""
-    lecture = lecturesCrud.get_lecture_by_slug(db, slug)
-    if not lecture:
+    info = lecturesCrud.get_lecture_access_info(db, slug)
+    if not info:
         raise HTTPException(status_code=404, detail="Lecture not found")
     
-    if lecture.is_free:
-        return lecture
-    
-    course_id = lecture.chapter.course_id
-    
-    user_enrollment = AccountCrud.get_user_registered_course(db, current_user.id, course_id)
-    if not user_enrollment:
-        raise HTTPException(status_code=403, detail="You must be enrolled in this course to access this lecture")
+    if not info.is_free:
+        if not enrollment_cache.is_enrolled(db, current_user.id, info.course_id):
+            raise HTTPException(status_code=403, detail="You must be enrolled in this course to access this lecture")
     
+    etag = conditional.make_etag("lecture", info.id, info.updated_at)
+    if conditional.is_not_modified(request, etag, info.updated_at):
+        return conditional.not_modified(etag, info.updated_at)
+
+    lecture = lecturesCrud.get_lecture_by_slug(db, slug)
+    conditional.set_validators(response, etag, info.updated_at)
     return lecture
 
 
+@router.post("/lectures/access", response_model=List[LectureAccess])
+@query_budget(4)
+def get_lectures_access(payload: LectureAccessRequest, db: Session = Depends(deps.get_read_db), current_user: Principal = Depends(get_current_principal)):
+    """Check in one call whether the current user may open each of the given lectures, e.g. to prefetch a player playlist"""
+    found = {info.slug: info for info in lecturesCrud.get_lectures_access_info(db, payload.slugs)}
+    paid_course_ids = {info.course_id for info in found.values() if not info.is_free}
+    enrolled = enrollment_cache.get_enrolled_course_ids(db, current_user.id, paid_course_ids) if paid_course_ids else frozenset()
+
+    decisions = []
+    for slug in payload.slugs:
+        info = found.get(slug)
+        if info is None:
+            decisions.append(LectureAccess(slug=slug, allowed=False, reason="not_found"))
+        elif info.is_free:
+            decisions.append(LectureAccess(slug=slug, allowed=True, reason="free"))
+        elif info.course_id in enrolled:
+            decisions.append(LectureAccess(slug=slug, allowed=True, reason="enrolled"))
+        else:
+            decisions.append(LectureAccess(slug=slug, allowed=False, reason="not_enrolled"))
+    return decisions
+
+
 @router.post("/lectures", response_model=RetrieveLecture, status_code=status.HTTP_201_CREATED)
-def create_lecture(payload: CreateLecture, db: Session = Depends(deps.get_db), current_user: User = Depends(has_permission("manage_lectures"))):
+def create_lecture(payload: CreateLecture, db: Session = Depends(deps.get_db), current_user: Principal = Depends(has_permission("manage_lectures"))):
     """Create a new lecture"""
+    if lecturesCrud.get_lecture_by_slug(db, payload.slug):
+        raise HTTPException(status_code=400, detail="Lecture with this slug already exists.")
     lecture = lecturesCrud.create_lecture(db, payload)
     if not lecture:
         raise HTTPException(status_code=404, detail="Chapter with this slug not found.")
@@ -45,8 +84,10 @@ def create_lecture(payload: CreateLecture, db: Session = Depends(deps.get_db), c
 
 
 @router.patch("/lectures/{slug}", response_model=RetrieveLecture, status_code=status.HTTP_200_OK)
-def update_lecture(slug: str, payload: UpdateLecture, db: Session = Depends(deps.get_db), current_user: User = Depends(has_permission("manage_lectures"))):
+def update_lecture(slug: str, payload: UpdateLecture, db: Session = Depends(deps.get_db), current_user: Principal = Depends(has_permission("manage_lectures"))):
     """Update a lecture's information"""
+    if payload.slug and payload.slug != slug and lecturesCrud.get_lecture_by_slug(db, payload.slug):
+        raise HTTPException(status_code=400, detail="Lecture with this slug already exists.")
     lecture = lecturesCrud.update_lecture(db, slug, payload)
     if not lecture:
         raise HTTPException(status_code=404, detail="Lecture not found")
@@ -56,7 +97,7 @@ def update_lecture(slug: str, payload: UpdateLecture, db: Session = Depends(deps
 
 
 @router.delete("/lectures/{slug}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_lecture(slug: str, db: Session = Depends(deps.get_db), current_user: User = Depends(has_permission("manage_lectures"))):
+def delete_lecture(slug: str, db: Session = Depends(deps.get_db), current_user: Principal = Depends(has_permission("manage_lectures"))):
     """Delete a lecture"""
     result = lecturesCrud.delete_lecture(db, slug)
     if not result:
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, status, Depends, Query
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.schemas.search import SearchResponse
+import app.crud.search as searchCrud
+from typing import Literal, Optional
+
+router = APIRouter()
+
+@router.get("/search", response_model=SearchResponse, status_code=status.HTTP_200_OK, tags=["Search"])
+def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    type: Literal["all", "courses", "lectures"] = Query("all"),
+    is_free: Optional[bool] = Query(None),
+    language: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(deps.get_read_db)
+):
+    """Search courses (title, full name, description, lecturer, language) and lectures (title), most relevant first.
+
+    Every word of `q` matches as a prefix. Pass the returned `next_cursor` as `cursor` to fetch the next page.
+    """
+    results, next_cursor = searchCrud.search_catalog(db, q, type, is_free, language, limit, cursor)
+    return SearchResponse(results=results, next_cursor=next_cursor)
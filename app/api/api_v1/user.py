@@ -1,6 +1,6 @@
 from fastapi import Depends, APIRouter, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 from app.api import deps
 from app.models.user import User
 from app.crud import user as UserCrud
@@ -8,8 +8,9 @@ from app.schemas.user import (
     UserCreate, UserUpdate, UserOut, UserListOut, UserDetailOut,
     UserPasswordUpdate, UserRoleAssignment, UsersResponse, UserActivation
 )
-from app.dependencies import get_current_user, has_permission
-from app.services.hash_password import Hash
+from app.dependencies import get_current_user, get_current_user_read, get_current_principal, has_permission, Principal
+from app.db.query_stats import query_budget
+from app.services.hash_password import hasher
 
 router = APIRouter()
 
@@ -17,17 +18,39 @@ router = APIRouter()
 def list_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    current_user: User = Depends(has_permission("view_users")),
+    search_mode: Literal["auto", "like"] = Query("auto"),
+    count: Literal["exact", "estimated", "none"] = Query("estimated"),
+    include_total: bool = Query(False),
+    current_user: Principal = Depends(has_permission("view_users")),
     db: Session = Depends(deps.get_db)
 ):
-    """Get all users with pagination and search"""
+    """Get all users with pagination and search.
+
+    Pass the returned `next_cursor` as `cursor` to fetch the next page; `skip` is still
+    honoured for the first page but gets slower the deeper it goes.
+
+    `count` picks how `total` is computed for unfiltered listings: `exact` counts the table,
+    `estimated` reuses a recent count, `none` omits it. Searches only report a total (the exact
+    number of matches) when `include_total=true`; `include_total=true` also forces an exact count.
+
+    Searches are ranked by relevance and match word prefixes (suited to autocomplete) when the
+    full-text index exists; `search_mode=like` forces the plain substring search ordered by id.
+    """
     if search:
-        users = UserCrud.search_users(db, search, skip, limit)
+        users, next_cursor = UserCrud.search_users_page(db, search, limit, cursor=cursor, skip=skip, mode=search_mode)
     else:
-        users = UserCrud.get_users(db, skip, limit)
+        users, next_cursor = UserCrud.get_users_page(db, limit, cursor=cursor, skip=skip)
     
-    total = UserCrud.get_users_count(db)
+    if search:
+        total = UserCrud.search_users_count(db, search, mode=search_mode) if include_total else None
+    elif include_total or count == "exact":
+        total = UserCrud.get_users_count(db)
+    elif count == "estimated":
+        total = UserCrud.get_users_count_estimate(db)
+    else:
+        total = None
     
     # Convert User objects to UserListOut format
     users_data = [
@@ -43,14 +66,15 @@ def list_users(
         users=users_data,
         total=total,
         skip=skip,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/users/{user_id}", response_model=UserDetailOut, tags=["Users"])
 def get_user(
     user_id: int,
-    current_user: User = Depends(has_permission("view_users")),
+    current_user: Principal = Depends(has_permission("view_users")),
     db: Session = Depends(deps.get_db)
 ):
     """Get a specific user by ID"""
@@ -63,7 +87,7 @@ def get_user(
 @router.post("/users", response_model=UserOut, status_code=status.HTTP_201_CREATED, tags=["Users"])
 def create_user(
     user_data: UserCreate,
-    current_user: User = Depends(has_permission("create_users")),
+    current_user: Principal = Depends(has_permission("create_users")),
     db: Session = Depends(deps.get_db)
 ):
     """Create a new user"""
@@ -92,7 +116,7 @@ def create_user(
 def update_user(
     user_id: int,
     user_data: UserUpdate,
-    current_user: User = Depends(has_permission("edit_users")),
+    current_user: Principal = Depends(has_permission("edit_users")),
     db: Session = Depends(deps.get_db)
 ):
     """Update a user"""
@@ -127,7 +151,7 @@ def update_user(
 @router.delete("/users/{user_id}", status_code=status.HTTP_200_OK, tags=["Users"])
 def delete_user(
     user_id: int,
-    current_user: User = Depends(has_permission("delete_users")),
+    current_user: Principal = Depends(has_permission("delete_users")),
     db: Session = Depends(deps.get_db)
 ):
     """Delete a user"""
@@ -146,7 +170,7 @@ def delete_user(
 def assign_roles_to_user(
     user_id: int,
     role_data: UserRoleAssignment,
-    current_user: User = Depends(has_permission("manage_user_roles")),
+    current_user: Principal = Depends(has_permission("manage_user_roles")),
     db: Session = Depends(deps.get_db)
 ):
     """Assign roles to a user (replaces existing roles)"""
@@ -160,7 +184,7 @@ def assign_roles_to_user(
 def add_roles_to_user(
     user_id: int,
     role_data: UserRoleAssignment,
-    current_user: User = Depends(has_permission("manage_user_roles")),
+    current_user: Principal = Depends(has_permission("manage_user_roles")),
     db: Session = Depends(deps.get_db)
 ):
     """Add roles to a user (keeps existing roles)"""
@@ -174,7 +198,7 @@ def add_roles_to_user(
 def remove_roles_from_user(
     user_id: int,
     role_data: UserRoleAssignment,
-    current_user: User = Depends(has_permission("manage_user_roles")),
+    current_user: Principal = Depends(has_permission("manage_user_roles")),
     db: Session = Depends(deps.get_db)
 ):
     """Remove specific roles from a user"""
@@ -187,7 +211,7 @@ def remove_roles_from_user(
 @router.get("/users/{user_id}/roles", tags=["Users", "Roles"])
 def get_user_roles(
     user_id: int,
-    current_user: User = Depends(has_permission("manage_user_roles")),
+    current_user: Principal = Depends(has_permission("manage_user_roles")),
     db: Session = Depends(deps.get_db)
 ):
     """Get roles assigned to a user"""
@@ -201,21 +225,14 @@ def get_user_roles(
 def update_user_password(
     user_id: int,
     password_data: UserPasswordUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(deps.get_db)
 ):
     """Update user password (only own password or admin)"""
     # Check if user is updating their own password or is admin
     if user_id != current_user.id:
         # Check if current user has permission to edit other users
-        for role in current_user.roles:
-            for perm in role.permissions:
-                if perm.name == "edit_users":
-                    break
-            else:
-                continue
-            break
-        else:
+        if "edit_users" not in current_user.permissions:
             raise HTTPException(
                 status_code=403, 
                 detail="You can only update your own password"
@@ -226,7 +243,7 @@ def update_user_password(
         raise HTTPException(status_code=404, detail="User not found")
     
     # Verify current password
-    if not Hash().verify(password_data.current_password, user.password):
+    if not hasher.verify(password_data.current_password, user.password):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
     # Update password
@@ -237,7 +254,7 @@ def update_user_password(
 @router.put("/users/{user_id}/activate", response_model=UserOut, tags=["Users"])
 def activate_user(
     user_id: int,
-    current_user: User = Depends(has_permission("manage_users")),
+    current_user: Principal = Depends(has_permission("manage_users")),
     db: Session = Depends(deps.get_db)
 ):
     """Activate a user"""
@@ -250,7 +267,7 @@ def activate_user(
 @router.put("/users/{user_id}/deactivate", response_model=UserOut, tags=["Users"])
 def deactivate_user(
     user_id: int,
-    current_user: User = Depends(has_permission("manage_users")),
+    current_user: Principal = Depends(has_permission("manage_users")),
     db: Session = Depends(deps.get_db)
 ):
     """Deactivate a user"""
@@ -266,7 +283,8 @@ def deactivate_user(
 
 # Current user endpoints
 @router.get("/me", response_model=UserDetailOut, tags=["Current User"])
-def get_current_user_profile(current_user: User = Depends(get_current_user)):
+@query_budget(3)
+def get_current_user_profile(current_user: User = Depends(get_current_user_read)):
     """Get current user profile"""
     return current_user
 
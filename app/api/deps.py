@@ -1,4 +1,7 @@
 from app.db.session import SessionLocal
+from app.db.async_session import AsyncSessionLocal
+from app.db import replicas
+from fastapi import Request
 from sqlalchemy.orm import Session
 
 def get_db():
@@ -6,4 +9,20 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()    
\ No newline at end of file
+        db.close()
+
+
+def get_read_db(request: Request):
+    """
+    Session for read-only handlers: a read replica when configured, otherwise the primary.
+    """
+    db = replicas.read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
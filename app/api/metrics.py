@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+from app.services import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Expose metrics in the Prometheus text format"""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
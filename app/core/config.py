@@ -1,9 +1,70 @@
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "EduPlatform"
     DATABASE_URL: str = "sqlite:///./db.sqlite3"
 
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # validate: check the database is at the Alembic head revision, create nothing
+    # create_all: create missing tables (opt in for local development and tests only)
+    # skip: touch nothing at startup
+    DB_STARTUP_MODE: Literal["create_all", "validate", "skip"] = "validate"
+    SCHEMA_STAMP_FILE: str = ".schema_head_stamp"
+
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_STICKY_SECONDS: int = 5
+    REPLICA_RETRY_AFTER_SECONDS: int = 30
+
+    QUERY_DEBUG_HEADERS: bool = False
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 5
+    QUERY_BUDGET_STRICT: bool = False
+
+    METRICS_REFRESH_SECONDS: float = 1.0
+
+    USE_ASYNC_DB: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_TEMP_STORE: str = "MEMORY"
+
+    PERMISSION_CACHE_TTL_SECONDS: int = 300
+    PERMISSION_CACHE_MAX_SIZE: int = 10000
+
+    ACCESS_TOKEN_EMBED_AUTHZ: bool = False
+    AUTHZ_VERSION_CACHE_TTL_SECONDS: int = 15
+
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 16
+
+    CATALOG_CACHE_TTL_SECONDS: int = 30
+
+    ENROLLMENT_CACHE_TTL_SECONDS: int = 300
+    ENROLLMENT_CACHE_MAX_SIZE: int = 10000
+    # Upper bound on how long another worker keeps granting access after an unenrollment
+    ENROLLMENT_VERSION_CACHE_TTL_SECONDS: int = 15
+
+    # How long the outcome of a request is kept for replay to retries with the same Idempotency-Key
+    IDEMPOTENCY_TTL_SECONDS: int = 600
+
+    USER_COUNT_CACHE_TTL_SECONDS: int = 60
+
+    # memory: this process only (single worker); sqlite: a file shared by the workers of one
+    # host; database: the otp_codes table, shared by every worker
+    OTP_STORE: Literal["memory", "sqlite", "database"] = "database"
+    OTP_SQLITE_PATH: str = "./otp_codes.sqlite3"
+    OTP_TTL_SECONDS: int = 120
+    OTP_SWEEP_INTERVAL_SECONDS: int = 60
+
     class Config:
         env_file = ".env"
         extra = "ignore"
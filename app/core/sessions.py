@@ -0,0 +1,22 @@
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class PathSessionMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware that only runs for requests under `path`.
+
+    Other requests skip cookie decoding and signing entirely, and the cookie itself is scoped
+    to `path` so browsers do not send it to the rest of the API.
+    """
+
+    def __init__(self, app: ASGIApp, secret_key: str, path: str, **kwargs) -> None:
+        super().__init__(app, secret_key=secret_key, path=path, **kwargs)
+        self.path_prefix = path.rstrip("/")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] in ("http", "websocket") and (path == self.path_prefix or path.startswith(self.path_prefix + "/")):
+            await super().__call__(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
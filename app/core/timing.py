@@ -0,0 +1,42 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class PhaseTimer:
+    """
+    Records how long each named phase of a process (e.g. application startup) took.
+    """
+
+    def __init__(self, started: Optional[float] = None) -> None:
+        """
+        Args:
+            started (Optional[float]): time.perf_counter() value the total is measured from.
+        """
+        self.started = started if started is not None else time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, name: str, since: float) -> None:
+        """
+        Record a phase that began at `since` and ends now.
+        """
+        self.phases[name] = time.perf_counter() - since
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time the body of a `with` block as one phase.
+        """
+        since = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name, since)
+
+    def report(self) -> Dict[str, float]:
+        """
+        Get the phase durations and the total elapsed time, in milliseconds.
+        """
+        report = {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()}
+        report["total"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return report
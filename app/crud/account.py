@@ -1,59 +1,34 @@
+from typing import List
+from sqlalchemy import delete, literal, select
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from app.models.account import OtpCode
-from app.models.account import Role, Permission
+from app.models.account import Role, Permission, role_permission, user_role
+from app.models.learning import Course
+from app.models.user import User
 from app.schemas.account import CreatePermission, CreateRole
+from app.db import dialects, writes
+from app.services import enrollment_cache, permission_cache
 
 
-def get_otp_by_email(db: Session, email: str):
+def _bump_authz_version(db: Session, user_ids_query):
     """
-    Retrieve an OTP record by email.
+    Increment authz_version for every user selected by a subquery of user ids,
+    so tokens carrying their old permission claims are no longer trusted.
     """
-    return db.query(OtpCode).filter(OtpCode.email == email).first()
-
-
-def delete_otp(db: Session, otp: OtpCode):
-    """
-    Delete an OTP record from the database.
-
-    Args:
-        db (Session): SQLAlchemy database session.
-        otp (OtpCode): The OTP record to delete.
-
-    Returns:
-        None
-    """
-    db.delete(otp)
-    db.commit()
-
-
-def create_otp(db: Session, email: str, code: str):
-    """
-    Create and store a new OTP record in the database using email.
-    """
-    otp = OtpCode(
-        email=email,
-        code=code,
-        created_at=datetime.utcnow()
+    db.query(User).filter(User.id.in_(user_ids_query)).update(
+        {User.authz_version: User.authz_version + 1}, synchronize_session=False
     )
-    db.add(otp)
-    db.commit()
-    db.refresh(otp)
-    return otp
 
 
-def is_otp_expired(otp: OtpCode, minutes: int = 2):
-    """
-    Check if an OTP has expired based on its creation time.
+def _role_members(role_id: int):
+    return select(user_role.c.user_id).where(user_role.c.role_id == role_id)
 
-    Args:
-        otp (OtpCode): The OTP record to check.
-        minutes (int, optional): Expiration window in minutes. Default is 2.
 
-    Returns:
-        bool: True if expired, False otherwise.
-    """
-    return (datetime.utcnow() - otp.created_at) > timedelta(minutes=minutes)
+def _permission_holders(permission_id: int):
+    return (
+        select(user_role.c.user_id)
+        .join(role_permission, role_permission.c.role_id == user_role.c.role_id)
+        .where(role_permission.c.permission_id == permission_id)
+    )
 
 
 def create_role(db: Session, role_data):
@@ -67,10 +42,8 @@ def create_role(db: Session, role_data):
     Returns:
         Role: The created role object.
     """
-    role = Role(name=role_data.name)
-    db.add(role)
+    role = writes.insert_returning(db, Role, {"name": role_data.name}, empty=("permissions",))
     db.commit()
-    db.refresh(role)
     return role
 
 
@@ -113,12 +86,10 @@ def update_role(db: Session, role_id: int, data):
     Returns:
         Role or None: The updated role object if found, None otherwise.
     """
-    role = get_role(db, role_id)
+    role = writes.update_returning(db, Role, [Role.id == role_id], {"name": data.name})
     if not role:
         return None
-    role.name = data.name
     db.commit()
-    db.refresh(role)
     return role
 
 
@@ -137,7 +108,9 @@ def delete_role(db: Session, role_id: int):
     if not role:
         return None
     db.delete(role)
+    _bump_authz_version(db, _role_members(role_id))
     db.commit()
+    permission_cache.invalidate_all()
     return True
 
 
@@ -158,14 +131,19 @@ def assign_permissions_to_role(db: Session, role_id: int, permission_ids: list):
         return None
     permissions = db.query(Permission).filter(Permission.id.in_(permission_ids)).all()
     role.permissions = permissions
+    _bump_authz_version(db, _role_members(role_id))
     db.commit()
-    db.refresh(role)
+    permission_cache.invalidate_role(role_id)
     return role
 
 
 def add_permissions_to_role(db: Session, role_id: int, permission_ids: list):
     """
     Add new permissions to existing permissions of a role.
+
+    Inserts only the missing (role, permission) pairs with INSERT ... SELECT ... ON CONFLICT
+    DO NOTHING, selecting from `permissions` so unknown ids are ignored; the role's current
+    permissions are never loaded.
     
     Args:
         db (Session): SQLAlchemy database session.
@@ -178,24 +156,20 @@ def add_permissions_to_role(db: Session, role_id: int, permission_ids: list):
     role = get_role(db, role_id)
     if not role:
         return None
-    
-    # Get current permission IDs
-    current_permission_ids = [perm.id for perm in role.permissions]
-    
-    # Add new permission IDs to existing ones (avoid duplicates)
-    all_permission_ids = list(set(current_permission_ids + permission_ids))
-    
-    # Get all permissions and assign to role
-    permissions = db.query(Permission).filter(Permission.id.in_(all_permission_ids)).all()
-    role.permissions = permissions
-    db.commit()
-    db.refresh(role)
+
+    added = db.execute(
+        dialects.insert_ignore(db, role_permission, ["role_id", "permission_id"]).from_select(
+            ["role_id", "permission_id"],
+            select(literal(role_id), Permission.id).where(Permission.id.in_(set(permission_ids))),
+        )
+    ).rowcount
+    _commit_role_permissions(db, role, added)
     return role
 
 
 def remove_permissions_from_role(db: Session, role_id: int, permission_ids: list):
     """
-    Remove specific permissions from a role.
+    Remove specific permissions from a role with a single DELETE on the association rows.
     
     Args:
         db (Session): SQLAlchemy database session.
@@ -208,21 +182,30 @@ def remove_permissions_from_role(db: Session, role_id: int, permission_ids: list
     role = get_role(db, role_id)
     if not role:
         return None
-    
-    # Get current permission IDs
-    current_permission_ids = [perm.id for perm in role.permissions]
-    
-    # Remove specified permission IDs from current ones
-    remaining_permission_ids = [pid for pid in current_permission_ids if pid not in permission_ids]
-    
-    # Get remaining permissions and assign to role
-    permissions = db.query(Permission).filter(Permission.id.in_(remaining_permission_ids)).all()
-    role.permissions = permissions
-    db.commit()
-    db.refresh(role)
+
+    removed = db.execute(
+        delete(role_permission).where(
+            role_permission.c.role_id == role_id,
+            role_permission.c.permission_id.in_(set(permission_ids)),
+        )
+    ).rowcount
+    _commit_role_permissions(db, role, removed)
     return role
 
 
+def _commit_role_permissions(db: Session, role: Role, changed: int) -> None:
+    """
+    Commit a change to a role's permission rows, invalidating tokens and caches only if any row changed.
+    """
+    if changed:
+        _bump_authz_version(db, _role_members(role.id))
+    db.commit()
+    if changed:
+        permission_cache.invalidate_role(role.id)
+    # Reloaded from the association table when the response is serialized.
+    db.expire(role, ["permissions"])
+
+
 def get_role_permissions(db: Session, role_id: int):
     """
     Get list of permission names for a specific role.
@@ -251,10 +234,9 @@ def create_permission(db: Session, data):
     Returns:
         Permission: The created permission object.
     """
-    perm = Permission(name=data.name)
-    db.add(perm)
+    perm = writes.insert_returning(db, Permission, {"name": data.name}, empty=("roles",))
     db.commit()
-    db.refresh(perm)
+    permission_cache.invalidate_all()
     return perm
 
 
@@ -297,12 +279,11 @@ def update_permission(db: Session, permission_id: int, data):
     Returns:
         Permission or None: The updated permission object if found, None otherwise.
     """
-    permission = get_permission(db, permission_id)
+    permission = writes.update_returning(db, Permission, [Permission.id == permission_id], {"name": data.name})
     if not permission:
         return None
-    permission.name = data.name
     db.commit()
-    db.refresh(permission)
+    permission_cache.invalidate_all()
     return permission
 
 
@@ -320,36 +301,71 @@ def delete_permission(db: Session, permission_id: int):
     permission = get_permission(db, permission_id)
     if not permission:
         return None
+    _bump_authz_version(db, _permission_holders(permission_id))
     db.delete(permission)
     db.commit()
+    permission_cache.invalidate_all()
     return True
 
 # UserRegisteredCourse CRUD functions
+COURSE_NOT_FOUND = "course_not_found"
+
+
 def create_user_registered_course(db: Session, user_id: int, course_id: int):
     """
-    Create a new user registered course record.
+    Enroll a user in a course with a single INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+
+    Selecting the course id from `courses` inserts nothing for a course that does not exist,
+    and the unique (user_id, course_id) index turns a concurrent duplicate enrollment into a
+    no-op instead of a second row.
+
+    Returns:
+        UserRegisteredCourse, None if the user is already enrolled, or COURSE_NOT_FOUND.
     """
     from app.models.account import UserRegisteredCourse
-    
-    # Check if user is already registered for this course
-    existing = db.query(UserRegisteredCourse).filter(
-        UserRegisteredCourse.user_id == user_id,
-        UserRegisteredCourse.course_id == course_id
-    ).first()
-    
-    if existing:
-        return None  # Already registered
-    
-    registered_course = UserRegisteredCourse(
-        user_id=user_id,
-        course_id=course_id
-    )
-    db.add(registered_course)
+
+    stmt = dialects.insert_ignore(db, UserRegisteredCourse, ["user_id", "course_id"]).from_select(
+        ["user_id", "course_id"],
+        select(literal(user_id), Course.id).where(Course.id == course_id),
+    ).returning(UserRegisteredCourse)
+    registered_course = db.scalars(stmt).first()
+    if registered_course is None:
+        db.rollback()
+        return None if _course_exists(db, course_id) else COURSE_NOT_FOUND
     db.commit()
-    db.refresh(registered_course)
+    enrollment_cache.invalidate_user(user_id)
     return registered_course
 
 
+def create_user_registered_courses(db: Session, course_id: int, user_ids: List[int]):
+    """
+    Enroll many users in a course with a single INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+
+    Unknown user ids and users already enrolled are skipped.
+
+    Returns:
+        List[int] or str: Ids of the newly enrolled users, or COURSE_NOT_FOUND.
+    """
+    from app.models.account import UserRegisteredCourse
+
+    stmt = dialects.insert_ignore(db, UserRegisteredCourse, ["user_id", "course_id"]).from_select(
+        ["user_id", "course_id"],
+        select(User.id, Course.id).join(Course, Course.id == course_id).where(User.id.in_(set(user_ids))),
+    ).returning(UserRegisteredCourse.user_id)
+    enrolled = sorted(db.scalars(stmt))
+    if not enrolled and not _course_exists(db, course_id):
+        db.rollback()
+        return COURSE_NOT_FOUND
+    db.commit()
+    for user_id in enrolled:
+        enrollment_cache.invalidate_user(user_id)
+    return enrolled
+
+
+def _course_exists(db: Session, course_id: int) -> bool:
+    return db.query(Course.id).filter(Course.id == course_id).first() is not None
+
+
 def get_user_registered_courses(db: Session, user_id: int):
     """
     Get all courses registered by a user.
@@ -383,6 +399,8 @@ def delete_user_registered_course(db: Session, user_id: int, course_id: int):
     
     if registered_course:
         db.delete(registered_course)
+        enrollment_cache.bump_enrollment_version(db, user_id)
         db.commit()
+        enrollment_cache.invalidate_user(user_id)
         return True
     return False
\ No newline at end of file
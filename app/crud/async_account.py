@@ -0,0 +1,19 @@
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user import User
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
+    """
+    Get a user by ID.
+    """
+    return await db.get(User, user_id)
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    """
+    Get a user by email.
+    """
+    return (await db.scalars(select(User).where(User.email == email))).first()
+
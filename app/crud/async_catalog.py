@@ -0,0 +1,127 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.learning import Course, Chapter, Lecture
+import app.crud.courses as coursesCrud
+import app.crud.chapters as chaptersCrud
+import app.crud.lectures as lecturesCrud
+
+# Async counterparts of the catalog read paths in app/crud/courses.py, chapters.py and
+# lectures.py. Queries that are only a single SELECT are written natively; the paginated
+# and tree readers reuse the sync implementations through AsyncSession.run_sync, which
+# still performs its I/O on the async driver without blocking the event loop.
+
+
+async def get_all_courses(db: AsyncSession):
+    """
+    Retrieve all courses from the database.
+    
+    Args:
+        db (AsyncSession): SQLAlchemy async database session.
+    
+    Returns:
+        List[Course]: List of all course objects.
+    """
+    return (await db.scalars(select(Course))).all()
+
+
+async def get_courses_page(db: AsyncSession, limit: int, cursor: str = None, sort: str = "id"):
+    """
+    Retrieve one page of courses using keyset pagination.
+    
+    Returns:
+        Tuple[List[Course], Optional[str]]: The page of courses and the cursor of the next page.
+    """
+    return await db.run_sync(lambda session: coursesCrud.get_courses_page(session, limit, cursor, sort))
+
+
+async def get_course_by_slug(db: AsyncSession, slug: str):
+    """
+    Retrieve a course by its slug.
+    
+    Returns:
+        Course or None: The course object if found, None otherwise.
+    """
+    return (await db.scalars(select(Course).where(Course.slug == slug))).first()
+
+
+async def get_course_version(db: AsyncSession, slug: str):
+    """
+    Get (id, updated_at) of a course without loading it.
+
+    Returns:
+        Row or None: (id, updated_at) of the course if found, None otherwise.
+    """
+    return (await db.execute(select(Course.id, Course.updated_at).where(Course.slug == slug))).first()
+
+
+async def get_course_tree_version(db: AsyncSession, slug: str):
+    """
+    Get the columns identifying the current version of a course tree.
+    """
+    return await db.run_sync(lambda session: coursesCrud.get_course_tree_version(session, slug))
+
+
+async def get_course_tree(db: AsyncSession, slug: str):
+    """
+    Get a course with all of its chapters and lectures and their total durations.
+    """
+    return await db.run_sync(lambda session: coursesCrud.get_course_tree(session, slug))
+
+
+async def get_all_chapters(db: AsyncSession):
+    """
+    Retrieve all chapters from the database.
+    
+    Returns:
+        List[Chapter]: List of all chapter objects.
+    """
+    return (await db.scalars(select(Chapter))).all()
+
+
+async def get_chapters_page(db: AsyncSession, limit: int, cursor: str = None, sort: str = "id"):
+    """
+    Retrieve one page of chapters using keyset pagination.
+    """
+    return await db.run_sync(lambda session: chaptersCrud.get_chapters_page(session, limit, cursor, sort))
+
+
+async def get_all_lectures(db: AsyncSession):
+    """
+    Retrieve all lectures from the database.
+    
+    Returns:
+        List[Lecture]: List of all lecture objects.
+    """
+    return (await db.scalars(select(Lecture))).all()
+
+
+async def get_lectures_page(db: AsyncSession, limit: int, cursor: str = None, sort: str = "id"):
+    """
+    Retrieve one page of lectures using keyset pagination.
+    """
+    return await db.run_sync(lambda session: lecturesCrud.get_lectures_page(session, limit, cursor, sort))
+
+
+async def get_lecture_by_slug(db: AsyncSession, slug: str):
+    """
+    Retrieve a lecture by its slug.
+    
+    Returns:
+        Lecture or None: The lecture object if found, None otherwise.
+    """
+    return (await db.scalars(select(Lecture).where(Lecture.slug == slug))).first()
+
+
+async def get_lecture_access_info(db: AsyncSession, slug: str):
+    """
+    Get the columns needed to authorize and validate a lecture view without loading it.
+
+    Returns:
+        Row or None: (id, updated_at, is_free, course_id) of the lecture if found, None otherwise.
+    """
+    return (
+        await db.execute(
+            select(Lecture.id, Lecture.updated_at, Lecture.is_free, Lecture.course_id)
+            .where(Lecture.slug == slug)
+        )
+    ).first()
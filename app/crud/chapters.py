@@ -1,6 +1,11 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from app.models.learning import Course, Chapter
+from app.models.learning import Course, Chapter, Lecture
 from app.schemas.learning import CreateChapter, UpdateChapter
+from app.services import catalog_cache
+from app.crud import search as searchCrud
+from app.db import writes
+from app.services.pagination import keyset_page
 
 
 def get_all_chapters(db: Session):
@@ -16,6 +21,23 @@ def get_all_chapters(db: Session):
     return db.query(Chapter).all()
 
 
+def get_chapters_page(db: Session, limit: int, cursor: str = None, sort: str = "id"):
+    """
+    Retrieve one page of chapters using keyset pagination.
+    
+    Args:
+        db (Session): SQLAlchemy database session.
+        limit (int): Maximum number of chapters to return.
+        cursor (str): Cursor returned with the previous page, if any.
+        sort (str): "id" to order by id, "updated" to order by (updated_at, id).
+    
+    Returns:
+        Tuple[List[Chapter], Optional[str]]: The page of chapters and the cursor of the next page.
+    """
+    columns = [Chapter.updated_at, Chapter.id] if sort == "updated" else [Chapter.id]
+    return keyset_page(db.query(Chapter), columns, limit, cursor=cursor)
+
+
 def get_chapter_by_slug(db: Session, slug: str):
     """
     Retrieve a chapter by its slug.
@@ -30,6 +52,40 @@ def get_chapter_by_slug(db: Session, slug: str):
     return db.query(Chapter).filter(Chapter.slug == slug).first()
 
 
+def get_chapter_version(db: Session, slug: str):
+    """
+    Get the columns identifying the current version of a chapter without loading it.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        slug (str): The slug of the chapter.
+
+    Returns:
+        Row or None: (id, updated_at) of the chapter if found, None otherwise.
+    """
+    return db.query(Chapter.id, Chapter.updated_at).filter(Chapter.slug == slug).first()
+
+
+def get_chapter_lectures_version(db: Session, slug: str):
+    """
+    Get the columns identifying the current version of a chapter's lecture list.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        slug (str): The slug of the chapter.
+
+    Returns:
+        Row or None: (id, lecture count, latest lecture updated_at) if chapter found, None otherwise.
+    """
+    return (
+        db.query(Chapter.id, func.count(Lecture.id), func.max(Lecture.updated_at))
+        .outerjoin(Lecture, Lecture.chapter_id == Chapter.id)
+        .filter(Chapter.slug == slug)
+        .group_by(Chapter.id)
+        .first()
+    )
+
+
 def get_course_by_slug(db: Session, slug: str):
     """
     Retrieve a course by its slug.
@@ -60,12 +116,11 @@ def create_chapter(db: Session, chapter_data: CreateChapter):
         return None
     
     payload_dict = chapter_data.dict(exclude={"course_slug"})
-    chapter = Chapter(**payload_dict)
-    chapter.course_id = course.id
+    payload_dict["course_id"] = course.id
+    chapter = writes.insert_returning(db, Chapter, payload_dict, empty=("lectures",))
 
-    db.add(chapter)
+    catalog_cache.bump(db, "chapters")
     db.commit()
-    db.refresh(chapter)
     return chapter
 
 
@@ -81,24 +136,26 @@ def update_chapter(db: Session, slug: str, chapter_data: UpdateChapter):
     Returns:
         Chapter or None: The updated chapter object if found, None otherwise.
     """
-    chapter = get_chapter_by_slug(db, slug)
+    data = chapter_data.dict(exclude_unset=True)
+    course_slug = data.pop("course_slug", None)
+
+    chapter = writes.update_returning(db, Chapter, [Chapter.slug == slug], data)
     if not chapter:
         return None
 
-    data = chapter_data.dict(exclude_unset=True)
-    course_slug = data.pop("course_slug", None)
-    
     if course_slug:
         course = get_course_by_slug(db, course_slug)
         if not course:
+            db.rollback()
             return "course_not_found"
-        chapter.course = course
-
-    for field, value in data.items():
-        setattr(chapter, field, value)
+        if course.id != chapter.course_id:
+            db.query(Lecture).filter(Lecture.chapter_id == chapter.id).update(
+                {Lecture.course_id: course.id}, synchronize_session=False
+            )
+            chapter.course_id = course.id
 
+    catalog_cache.bump(db, "chapters")
     db.commit()
-    db.refresh(chapter)
     return chapter
 
 
@@ -117,7 +174,9 @@ def delete_chapter(db: Session, slug: str):
     if not chapter:
         return None
     
+    searchCrud.unindex_chapter(db, chapter.id)
     db.delete(chapter)
+    catalog_cache.bump(db, "chapters", "lectures")
     db.commit()
     return True
 
@@ -1,6 +1,11 @@
-from sqlalchemy.orm import Session
-from app.models.learning import Course
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+from app.models.learning import Course, Chapter, Lecture
 from app.schemas.learning import CreateCourse, UpdateCourse
+from app.services import catalog_cache
+from app.crud import search as searchCrud
+from app.db import writes
+from app.services.pagination import keyset_page
 
 
 def get_all_courses(db: Session):
@@ -16,6 +21,23 @@ def get_all_courses(db: Session):
     return db.query(Course).all()
 
 
+def get_courses_page(db: Session, limit: int, cursor: str = None, sort: str = "id"):
+    """
+    Retrieve one page of courses using keyset pagination.
+    
+    Args:
+        db (Session): SQLAlchemy database session.
+        limit (int): Maximum number of courses to return.
+        cursor (str): Cursor returned with the previous page, if any.
+        sort (str): "id" to order by id, "updated" to order by (updated_at, id).
+    
+    Returns:
+        Tuple[List[Course], Optional[str]]: The page of courses and the cursor of the next page.
+    """
+    columns = [Course.updated_at, Course.id] if sort == "updated" else [Course.id]
+    return keyset_page(db.query(Course), columns, limit, cursor=cursor)
+
+
 def get_course_by_slug(db: Session, slug: str):
     """
     Retrieve a course by its slug.
@@ -30,6 +52,69 @@ def get_course_by_slug(db: Session, slug: str):
     return db.query(Course).filter(Course.slug == slug).first()
 
 
+def get_course_version(db: Session, slug: str):
+    """
+    Get the columns identifying the current version of a course without loading it.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        slug (str): The slug of the course.
+
+    Returns:
+        Row or None: (id, updated_at) of the course if found, None otherwise.
+    """
+    return db.query(Course.id, Course.updated_at).filter(Course.slug == slug).first()
+
+
+def get_course_chapters_version(db: Session, slug: str):
+    """
+    Get the columns identifying the current version of a course's chapter list.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        slug (str): The slug of the course.
+
+    Returns:
+        Row or None: (id, chapter count, latest chapter updated_at) if course found, None otherwise.
+    """
+    return (
+        db.query(Course.id, func.count(Chapter.id), func.max(Chapter.updated_at))
+        .outerjoin(Chapter, Chapter.course_id == Course.id)
+        .filter(Course.slug == slug)
+        .group_by(Course.id)
+        .first()
+    )
+
+
+def get_course_tree_version(db: Session, slug: str):
+    """
+    Get the columns identifying the current version of a course tree.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        slug (str): The slug of the course.
+
+    Returns:
+        Row or None: (id, updated_at, chapter count, latest chapter updated_at,
+        lecture count, latest lecture updated_at) if course found, None otherwise.
+    """
+    return (
+        db.query(
+            Course.id,
+            Course.updated_at,
+            func.count(func.distinct(Chapter.id)),
+            func.max(Chapter.updated_at),
+            func.count(Lecture.id),
+            func.max(Lecture.updated_at),
+        )
+        .outerjoin(Chapter, Chapter.course_id == Course.id)
+        .outerjoin(Lecture, Lecture.chapter_id == Chapter.id)
+        .filter(Course.slug == slug)
+        .group_by(Course.id, Course.updated_at)
+        .first()
+    )
+
+
 def get_course_by_title(db: Session, title: str):
     """
     Retrieve a course by its title.
@@ -55,13 +140,10 @@ def create_course(db: Session, course_data: CreateCourse):
     Returns:
         Course: The created course object.
     """
-    course = Course()
-    for key, value in course_data.dict().items():
-        setattr(course, key, value)
-
-    db.add(course)
+    course = writes.insert_returning(db, Course, course_data.dict(), empty=("chapters",))
+    searchCrud.sync_course(db, course)
+    catalog_cache.bump(db, "courses")
     db.commit()
-    db.refresh(course)
     return course
 
 
@@ -77,15 +159,13 @@ def update_course(db: Session, slug: str, course_data: UpdateCourse):
     Returns:
         Course or None: The updated course object if found, None otherwise.
     """
-    course = get_course_by_slug(db, slug)
+    course = writes.update_returning(db, Course, [Course.slug == slug], course_data.dict(exclude_unset=True))
     if not course:
         return None
-    
-    for key, value in course_data.dict(exclude_unset=True).items():
-        setattr(course, key, value)
+    searchCrud.sync_course(db, course)
 
+    catalog_cache.bump(db, "courses")
     db.commit()
-    db.refresh(course)
     return course
 
 
@@ -104,7 +184,9 @@ def delete_course(db: Session, slug: str):
     if not course:
         return None
     
+    searchCrud.unindex_course(db, course.id)
     db.delete(course)
+    catalog_cache.bump(db, "courses", "chapters", "lectures")
     db.commit()
     return True
 
@@ -124,3 +206,59 @@ def get_course_chapters(db: Session, slug: str):
     if not course:
         return None
     return course.chapters
+
+
+def _seconds(value) -> int:
+    if value is None:
+        return 0
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def get_course_tree(db: Session, slug: str):
+    """
+    Get a course with all of its chapters and lectures and their total durations.
+
+    Chapters and lectures are eager loaded with selectinload, so the whole tree costs
+    three SELECT statements regardless of how many chapters the course has.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        slug (str): The slug of the course.
+
+    Returns:
+        dict or None: The course tree if course found, None otherwise.
+    """
+    course = (
+        db.query(Course)
+        .options(selectinload(Course.chapters).selectinload(Chapter.lectures))
+        .filter(Course.slug == slug)
+        .first()
+    )
+    if not course:
+        return None
+
+    chapters = []
+    for chapter in sorted(course.chapters, key=lambda c: c.id):
+        lectures = sorted(chapter.lectures, key=lambda l: l.id)
+        chapters.append({
+            "id": chapter.id,
+            "title": chapter.title,
+            "slug": chapter.slug,
+            "is_free": chapter.is_free,
+            "lectures": lectures,
+            "total_time_seconds": sum(_seconds(lecture.time) for lecture in lectures),
+        })
+
+    return {
+        "id": course.id,
+        "title": course.title,
+        "slug": course.slug,
+        "full_name": course.full_name,
+        "lecturer": course.lecturer,
+        "language": course.language,
+        "is_free": course.is_free,
+        "description": course.description,
+        "updated_at": course.updated_at,
+        "chapters": chapters,
+        "total_time_seconds": sum(chapter["total_time_seconds"] for chapter in chapters),
+    }
@@ -1,6 +1,11 @@
+from typing import List
 from sqlalchemy.orm import Session
 from app.models.learning import Chapter, Lecture
 from app.schemas.learning import CreateLecture, UpdateLecture
+from app.services import catalog_cache
+from app.crud import search as searchCrud
+from app.db import writes
+from app.services.pagination import keyset_page
 
 
 def get_all_lectures(db: Session):
@@ -16,6 +21,23 @@ def get_all_lectures(db: Session):
     return db.query(Lecture).all()
 
 
+def get_lectures_page(db: Session, limit: int, cursor: str = None, sort: str = "id"):
+    """
+    Retrieve one page of lectures using keyset pagination.
+    
+    Args:
+        db (Session): SQLAlchemy database session.
+        limit (int): Maximum number of lectures to return.
+        cursor (str): Cursor returned with the previous page, if any.
+        sort (str): "id" to order by id, "updated" to order by (updated_at, id).
+    
+    Returns:
+        Tuple[List[Lecture], Optional[str]]: The page of lectures and the cursor of the next page.
+    """
+    columns = [Lecture.updated_at, Lecture.id] if sort == "updated" else [Lecture.id]
+    return keyset_page(db.query(Lecture), columns, limit, cursor=cursor)
+
+
 def get_lecture_by_slug(db: Session, slug: str):
     """
     Retrieve a lecture by its slug.
@@ -30,6 +52,44 @@ def get_lecture_by_slug(db: Session, slug: str):
     return db.query(Lecture).filter(Lecture.slug == slug).first()
 
 
+def get_lecture_access_info(db: Session, slug: str):
+    """
+    Get the columns needed to authorize and validate a lecture view without loading it.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        slug (str): The slug of the lecture.
+
+    Returns:
+        Row or None: (id, updated_at, is_free, course_id) of the lecture if found, None otherwise.
+    """
+    return (
+        db.query(Lecture.id, Lecture.updated_at, Lecture.is_free, Lecture.course_id)
+        .filter(Lecture.slug == slug)
+        .first()
+    )
+
+
+def get_lectures_access_info(db: Session, slugs: List[str]):
+    """
+    Get the columns needed to authorize several lecture views in one query.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        slugs (List[str]): The slugs of the lectures.
+
+    Returns:
+        List[Row]: (slug, is_free, course_id) of every lecture found.
+    """
+    if not slugs:
+        return []
+    return (
+        db.query(Lecture.slug, Lecture.is_free, Lecture.course_id)
+        .filter(Lecture.slug.in_(slugs))
+        .all()
+    )
+
+
 def get_chapter_by_slug(db: Session, slug: str):
     """
     Retrieve a chapter by its slug.
@@ -60,12 +120,13 @@ def create_lecture(db: Session, lecture_data: CreateLecture):
         return None
     
     payload_dict = lecture_data.dict(exclude={"chapter_slug"})
-    lecture = Lecture(**payload_dict)
-    lecture.chapter = chapter
+    payload_dict["chapter_id"] = chapter.id
+    payload_dict["course_id"] = chapter.course_id
+    lecture = writes.insert_returning(db, Lecture, payload_dict)
 
-    db.add(lecture)
+    searchCrud.sync_lecture(db, lecture)
+    catalog_cache.bump(db, "lectures")
     db.commit()
-    db.refresh(lecture)
     return lecture
 
 
@@ -81,24 +142,24 @@ def update_lecture(db: Session, slug: str, lecture_data: UpdateLecture):
     Returns:
         Lecture or None: The updated lecture object if found, None otherwise.
     """
-    lecture = get_lecture_by_slug(db, slug)
+    data = lecture_data.dict(exclude_unset=True)
+    chapter_slug = data.pop("chapter_slug", None)
+
+    lecture = writes.update_returning(db, Lecture, [Lecture.slug == slug], data)
     if not lecture:
         return None
 
-    data = lecture_data.dict(exclude_unset=True)
-    chapter_slug = data.pop("chapter_slug", None)
-    
     if chapter_slug:
         chapter = get_chapter_by_slug(db, chapter_slug)
         if not chapter:
+            db.rollback()
             return "chapter_not_found"
-        lecture.chapter = chapter
-
-    for key, value in data.items():
-        setattr(lecture, key, value)
+        lecture.chapter_id = chapter.id
+        lecture.course_id = chapter.course_id
+    searchCrud.sync_lecture(db, lecture)
 
+    catalog_cache.bump(db, "lectures")
     db.commit()
-    db.refresh(lecture)
     return lecture
 
 
@@ -117,6 +178,8 @@ def delete_lecture(db: Session, slug: str):
     if not lecture:
         return None
     
+    searchCrud.unindex_lecture(db, lecture.id)
     db.delete(lecture)
+    catalog_cache.bump(db, "lectures")
     db.commit()
     return True
\ No newline at end of file
@@ -0,0 +1,242 @@
+from typing import List, Optional, Tuple
+from sqlalchemy import column, func, literal, literal_column, or_, select, table, union_all
+from sqlalchemy.orm import Session
+from app.models.learning import Course, Lecture
+from app.services import fulltext
+from app.services.pagination import decode_offset_cursor, encode_cursor
+
+COURSES_FTS = "courses_fts"
+LECTURES_FTS = "lectures_fts"
+COURSES_SEARCH_INDEX = "ix_courses_search"
+LECTURES_SEARCH_INDEX = "ix_lectures_search"
+
+COURSE_FIELDS = ("title", "full_name", "description", "lecturer", "language")
+LECTURE_FIELDS = ("title",)
+
+# Per-column BM25 weights of courses_fts, in COURSE_FIELDS order.
+COURSE_WEIGHTS = (10.0, 5.0, 1.0, 3.0, 1.0)
+
+# Must stay identical to the indexed expressions created by the search index migration,
+# otherwise Postgres cannot use the GIN indexes.
+COURSE_DOCUMENT = (
+    "to_tsvector('simple', coalesce(courses.title, '') || ' ' || coalesce(courses.full_name, '') || ' ' || "
+    "coalesce(courses.description, '') || ' ' || coalesce(courses.lecturer, '') || ' ' || "
+    "coalesce(courses.language, ''))"
+)
+LECTURE_DOCUMENT = "to_tsvector('simple', coalesce(lectures.title, ''))"
+
+_courses_fts = table(COURSES_FTS, column("rowid"))
+_lectures_fts = table(LECTURES_FTS, column("rowid"))
+
+
+def sync_course(db: Session, course: Course) -> None:
+    """
+    Update the search index entry of a course. Call before committing.
+    """
+    fulltext.sync_row(db, COURSES_FTS, course.id, {field: getattr(course, field) for field in COURSE_FIELDS})
+
+
+def sync_lecture(db: Session, lecture: Lecture) -> None:
+    """
+    Update the search index entry of a lecture. Call before committing.
+    """
+    fulltext.sync_row(db, LECTURES_FTS, lecture.id, {field: getattr(lecture, field) for field in LECTURE_FIELDS})
+
+
+def unindex_course(db: Session, course_id: int) -> None:
+    """
+    Remove a course and all of its lectures from the search index. Call before deleting the course.
+    """
+    lecture_ids = db.query(Lecture.id).filter(Lecture.course_id == course_id)
+    fulltext.delete_rows(db, LECTURES_FTS, [row.id for row in lecture_ids])
+    fulltext.delete_row(db, COURSES_FTS, course_id)
+
+
+def unindex_chapter(db: Session, chapter_id: int) -> None:
+    """
+    Remove all lectures of a chapter from the search index. Call before deleting the chapter.
+    """
+    lecture_ids = db.query(Lecture.id).filter(Lecture.chapter_id == chapter_id)
+    fulltext.delete_rows(db, LECTURES_FTS, [row.id for row in lecture_ids])
+
+
+def unindex_lecture(db: Session, lecture_id: int) -> None:
+    """
+    Remove a lecture from the search index. Call before deleting the lecture.
+    """
+    fulltext.delete_row(db, LECTURES_FTS, lecture_id)
+
+
+def _backend(db: Session) -> str:
+    """
+    Pick how to search: "fts5", "tsvector", or "like" when no index has been built.
+    """
+    dialect = fulltext.dialect_name(db)
+    if dialect == "sqlite" and fulltext.index_available(db, COURSES_FTS) and fulltext.index_available(db, LECTURES_FTS):
+        return "fts5"
+    if (
+        dialect == "postgresql"
+        and fulltext.index_available(db, COURSES_SEARCH_INDEX)
+        and fulltext.index_available(db, LECTURES_SEARCH_INDEX)
+    ):
+        return "tsvector"
+    return "like"
+
+
+def _tsvector_match(document_sql: str, query: str):
+    """
+    Build the `document @@ tsquery` filter and its score (negated, so lower is better as with BM25).
+    """
+    document = literal_column(document_sql)
+    tsquery = func.to_tsquery(literal_column("'simple'"), fulltext.prefix_tsquery(query))
+    return document.op("@@")(tsquery), -func.ts_rank(document, tsquery)
+
+
+def _course_hits(backend: str, query: str, is_free: Optional[bool], language: Optional[str]):
+    columns = [literal("course").label("kind"), Course.id.label("id")]
+    if backend == "fts5":
+        weights = ", ".join(str(weight) for weight in COURSE_WEIGHTS)
+        score = literal_column(f"bm25({COURSES_FTS}, {weights})")
+        stmt = select(*columns, score.label("score")).select_from(
+            _courses_fts.join(Course, Course.id == _courses_fts.c.rowid)
+        ).where(fulltext.matches(COURSES_FTS, fulltext.match_expression(query)))
+    elif backend == "tsvector":
+        condition, score = _tsvector_match(COURSE_DOCUMENT, query)
+        stmt = select(*columns, score.label("score")).where(condition)
+    else:
+        stmt = select(*columns, literal(0.0).label("score")).where(
+            or_(*[getattr(Course, field).contains(query) for field in COURSE_FIELDS])
+        )
+    if is_free is not None:
+        stmt = stmt.where(Course.is_free == is_free)
+    if language:
+        stmt = stmt.where(Course.language == language)
+    return stmt
+
+
+def _lecture_hits(backend: str, query: str, is_free: Optional[bool], language: Optional[str]):
+    columns = [literal("lecture").label("kind"), Lecture.id.label("id")]
+    if backend == "fts5":
+        score = fulltext.rank(LECTURES_FTS)
+        stmt = select(*columns, score.label("score")).select_from(
+            _lectures_fts.join(Lecture, Lecture.id == _lectures_fts.c.rowid)
+        ).where(fulltext.matches(LECTURES_FTS, fulltext.match_expression(query)))
+    elif backend == "tsvector":
+        condition, score = _tsvector_match(LECTURE_DOCUMENT, query)
+        stmt = select(*columns, score.label("score")).where(condition)
+    else:
+        stmt = select(*columns, literal(0.0).label("score")).where(Lecture.title.contains(query))
+    if is_free is not None:
+        stmt = stmt.where(Lecture.is_free == is_free)
+    if language:
+        stmt = stmt.join(Course, Course.id == Lecture.course_id).where(
+            Course.language == language
+        )
+    return stmt
+
+
+def _ranked(hits):
+    """
+    Replace the score of each hit by its position among the hits of the same kind.
+
+    Scores of the two indexes are not comparable (BM25 over differently weighted columns on
+    SQLite, ts_rank over documents of very different lengths on Postgres), so results are
+    merged by position instead: best course, best lecture, second course, and so on.
+    """
+    hits = hits.subquery()
+    position = func.row_number().over(order_by=(hits.c.score, hits.c.id))
+    return select(hits.c.kind, hits.c.id, position.label("position"))
+
+
+def search_catalog(
+    db: Session,
+    query: str,
+    kind: str = "all",
+    is_free: Optional[bool] = None,
+    language: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Search courses and lectures, most relevant first.
+
+    Ranks come from the FTS5 tables on SQLite (BM25) and the tsvector GIN indexes on
+    Postgres; every word of the query matches as a prefix. Courses and lectures are ranked
+    separately and interleaved. Without an index, falls back to substring matching ordered by id.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        query (str): Free-text query.
+        kind (str): "all", "courses" or "lectures".
+        is_free (Optional[bool]): Only return free (True) or paid (False) items.
+        language (Optional[str]): Only return courses, or lectures of courses, in this language.
+        limit (int): Page size.
+        cursor (Optional[str]): Cursor returned with the previous page, if any.
+
+    Returns:
+        Tuple[List[dict], Optional[str]]: The page of hits and the cursor of the next page.
+    """
+    skip = decode_offset_cursor(cursor) if cursor else 0
+    backend = _backend(db)
+    if backend == "fts5" and fulltext.match_expression(query) is None:
+        return [], None
+    if backend == "tsvector" and fulltext.prefix_tsquery(query) is None:
+        return [], None
+
+    parts = []
+    if kind in ("all", "courses"):
+        parts.append(_ranked(_course_hits(backend, query, is_free, language)))
+    if kind in ("all", "lectures"):
+        parts.append(_ranked(_lecture_hits(backend, query, is_free, language)))
+    hits = union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
+
+    rows = db.execute(
+        select(hits.c.kind, hits.c.id)
+        .order_by(hits.c.position, hits.c.kind, hits.c.id)
+        .offset(skip)
+        .limit(limit + 1)
+    ).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(["offset", skip + limit])
+    return _load_hits(db, rows), next_cursor
+
+
+def _load_hits(db: Session, rows) -> List[dict]:
+    """
+    Load the display fields of the matched courses and lectures, keeping the ranked order.
+    """
+    course_ids = [row.id for row in rows if row.kind == "course"]
+    lecture_ids = [row.id for row in rows if row.kind == "lecture"]
+    found = {}
+    if course_ids:
+        for course in db.query(Course.id, Course.title, Course.slug, Course.is_free, Course.language).filter(
+            Course.id.in_(course_ids)
+        ):
+            found[("course", course.id)] = {
+                "kind": "course",
+                "id": course.id,
+                "title": course.title,
+                "slug": course.slug,
+                "is_free": course.is_free,
+                "language": course.language,
+                "course_slug": course.slug,
+            }
+    if lecture_ids:
+        lectures = (
+            db.query(Lecture.id, Lecture.title, Lecture.slug, Lecture.is_free, Course.language, Course.slug.label("course_slug"))
+            .outerjoin(Course, Course.id == Lecture.course_id)
+            .filter(Lecture.id.in_(lecture_ids))
+        )
+        for lecture in lectures:
+            found[("lecture", lecture.id)] = {
+                "kind": "lecture",
+                "id": lecture.id,
+                "title": lecture.title,
+                "slug": lecture.slug,
+                "is_free": lecture.is_free,
+                "language": lecture.language,
+                "course_slug": lecture.course_slug,
+            }
+    return [found[(row.kind, row.id)] for row in rows if (row.kind, row.id) in found]
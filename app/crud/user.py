@@ -1,8 +1,21 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import case, column, delete, func, literal, select, table
+from sqlalchemy.orm import Query, Session
+from typing import Optional, List, Tuple
 from app.models.user import User
-from app.models.account import Role
-from app.services.hash_password import Hash
+from app.models.account import Role, user_role
+from app.services.hash_password import hasher
+from app.services import enrollment_cache, permission_cache
+from app.services import fulltext
+from app.services.pagination import InvalidCursor, is_offset_cursor, keyset_page, offset_page
+from app.services.cache import create_cache
+from app.core.config import settings
+from app.db import dialects, writes
+
+_user_count = create_cache("user_count", maxsize=1, ttl=settings.USER_COUNT_CACHE_TTL_SECONDS)
+
+USERS_FTS = "users_fts"
+USERS_TRGM_INDEX = "ix_users_email_trgm"
+_users_fts = table(USERS_FTS, column("rowid"))
 
 
 def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
@@ -30,26 +43,32 @@ def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
     """
     Get all users with pagination.
     """
-    return db.query(User).offset(skip).limit(limit).all()
+    return db.query(User).order_by(User.id).offset(skip).limit(limit).all()
+
+
+def get_users_page(db: Session, limit: int = 100, cursor: Optional[str] = None, skip: int = 0) -> Tuple[List[User], Optional[str]]:
+    """
+    Get a page of users ordered by id, continuing after `cursor` (or `skip` rows when no cursor is given).
+    """
+    return keyset_page(db.query(User), [User.id], limit, cursor=cursor, skip=skip)
 
 
-def create_user(db: Session, email: str, username: str = None, password: str = None, is_registered: bool = False) -> User:
+def create_user(db: Session, email: str, username: str = None, password: str = None, is_registered: bool = False, hashed_password: str = None) -> User:
     """
-    Create a new user.
+    Create a new user, from a plain `password` or an already computed `hashed_password`.
     """
-    hashed_password = None
     if password:
-        hashed_password = Hash().bcrypt(password)
+        hashed_password = hasher.bcrypt(password)
     
-    user = User(
-        email=email,
-        username=username,
-        password=hashed_password,
-        is_registered=is_registered
-    )
-    db.add(user)
+    user = writes.insert_returning(db, User, {
+        "email": email,
+        "username": username,
+        "password": hashed_password,
+        "is_registered": is_registered,
+    }, empty=("roles",))
+    _index_user(db, user)
     db.commit()
-    db.refresh(user)
+    _adjust_users_count(1)
     return user
 
 
@@ -57,21 +76,26 @@ def update_user(db: Session, user_id: int, email: str = None, username: str = No
     """
     Update user information.
     """
-    user = get_user_by_id(db, user_id)
-    if not user:
-        return None
-    
+    values = {}
     if email is not None:
-        user.email = email
+        values["email"] = email
     if username is not None:
-        user.username = username
+        values["username"] = username
     if password is not None:
-        user.password = Hash().bcrypt(password)
+        values["password"] = hasher.bcrypt(password)
     if is_registered is not None:
-        user.is_registered = is_registered
+        values["is_registered"] = is_registered
+    if email is not None or password is not None or is_registered is not None:
+        values["authz_version"] = func.coalesce(User.authz_version, 0) + 1
+
+    user = writes.update_returning(db, User, [User.id == user_id], values)
+    if not user:
+        return None
+    if email is not None or username is not None:
+        _index_user(db, user)
     
     db.commit()
-    db.refresh(user)
+    permission_cache.invalidate_user(user_id)
     return user
 
 
@@ -83,8 +107,12 @@ def delete_user(db: Session, user_id: int) -> bool:
     if not user:
         return False
     
+    fulltext.delete_row(db, USERS_FTS, user_id)
     db.delete(user)
     db.commit()
+    _adjust_users_count(-1)
+    permission_cache.invalidate_user(user_id)
+    enrollment_cache.invalidate_user(user_id)
     return True
 
 
@@ -98,55 +126,61 @@ def assign_roles_to_user(db: Session, user_id: int, role_ids: List[int]) -> Opti
     
     roles = db.query(Role).filter(Role.id.in_(role_ids)).all()
     user.roles = roles
+    user.authz_version = (user.authz_version or 0) + 1
     db.commit()
-    db.refresh(user)
+    permission_cache.invalidate_user(user_id)
     return user
 
 
 def add_roles_to_user(db: Session, user_id: int, role_ids: List[int]) -> Optional[User]:
     """
     Add new roles to existing user roles.
+
+    Inserts only the missing (user, role) pairs with INSERT ... SELECT ... ON CONFLICT DO NOTHING,
+    selecting from `roles` so unknown ids are ignored; the user's current roles are never loaded.
     """
     user = get_user_by_id(db, user_id)
     if not user:
         return None
-    
-    # Get current role IDs
-    current_role_ids = [role.id for role in user.roles]
-    
-    # Add new role IDs to existing ones (avoid duplicates)
-    all_role_ids = list(set(current_role_ids + role_ids))
-    
-    # Get all roles and assign to user
-    roles = db.query(Role).filter(Role.id.in_(all_role_ids)).all()
-    user.roles = roles
-    db.commit()
-    db.refresh(user)
+
+    added = db.execute(
+        dialects.insert_ignore(db, user_role, ["user_id", "role_id"]).from_select(
+            ["user_id", "role_id"],
+            select(literal(user_id), Role.id).where(Role.id.in_(set(role_ids))),
+        )
+    ).rowcount
+    _commit_user_roles(db, user, added)
     return user
 
 
 def remove_roles_from_user(db: Session, user_id: int, role_ids: List[int]) -> Optional[User]:
     """
-    Remove specific roles from a user.
+    Remove specific roles from a user with a single DELETE on the association rows.
     """
     user = get_user_by_id(db, user_id)
     if not user:
         return None
-    
-    # Get current role IDs
-    current_role_ids = [role.id for role in user.roles]
-    
-    # Remove specified role IDs from current ones
-    remaining_role_ids = [rid for rid in current_role_ids if rid not in role_ids]
-    
-    # Get remaining roles and assign to user
-    roles = db.query(Role).filter(Role.id.in_(remaining_role_ids)).all()
-    user.roles = roles
-    db.commit()
-    db.refresh(user)
+
+    removed = db.execute(
+        delete(user_role).where(user_role.c.user_id == user_id, user_role.c.role_id.in_(set(role_ids)))
+    ).rowcount
+    _commit_user_roles(db, user, removed)
     return user
 
 
+def _commit_user_roles(db: Session, user: User, changed: int) -> None:
+    """
+    Commit a change to a user's role rows, invalidating their tokens and cached roles only if any row changed.
+    """
+    if changed:
+        user.authz_version = (user.authz_version or 0) + 1
+    db.commit()
+    if changed:
+        permission_cache.invalidate_user(user.id)
+    # Reloaded from the association table when the response is serialized.
+    db.expire(user, ["roles"])
+
+
 def get_user_roles(db: Session, user_id: int) -> Optional[List[dict]]:
     """
     Get list of role names for a specific user.
@@ -157,20 +191,122 @@ def get_user_roles(db: Session, user_id: int) -> Optional[List[dict]]:
     return [{"id": role.id, "name": role.name} for role in user.roles]
 
 
+def _index_user(db: Session, user: User) -> None:
+    fulltext.sync_row(db, USERS_FTS, user.id, {"email": user.email, "username": user.username})
+
+
+def _like_filter(query: str):
+    return (User.email.contains(query)) | (User.username.contains(query))
+
+
+def _escape_like(query: str) -> str:
+    return query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _ranked_search(db: Session, query: str) -> Optional[Query]:
+    """
+    Build a relevance-ordered search on the full-text index of the current backend.
+
+    SQLite matches every word of the query as a prefix in the `users_fts` FTS5 table and
+    orders by BM25. Postgres filters with ILIKE, which the pg_trgm GIN indexes serve, and
+    puts prefix matches first, then orders by trigram similarity.
+
+    Returns:
+        Query or None: The ordered query, None if no index is available or the query has no searchable words.
+    """
+    dialect = fulltext.dialect_name(db)
+    if dialect == "sqlite" and fulltext.index_available(db, USERS_FTS):
+        expression = fulltext.match_expression(query)
+        if expression is None:
+            return None
+        return db.query(User).join(_users_fts, _users_fts.c.rowid == User.id).filter(
+            fulltext.matches(USERS_FTS, expression)
+        ).order_by(fulltext.rank(USERS_FTS), User.id)
+    if dialect == "postgresql" and fulltext.index_available(db, USERS_TRGM_INDEX):
+        username = func.coalesce(User.username, "")
+        # Escaped so that % and _ in the query match themselves, as in the LIKE fallback.
+        literal = _escape_like(query)
+        prefix = User.email.ilike(f"{literal}%", escape="\\") | username.ilike(f"{literal}%", escape="\\")
+        return db.query(User).filter(
+            User.email.ilike(f"%{literal}%", escape="\\") | username.ilike(f"%{literal}%", escape="\\")
+        ).order_by(
+            case((prefix, 0), else_=1),
+            func.greatest(func.similarity(User.email, query), func.similarity(username, query)).desc(),
+            User.id,
+        )
+    return None
+
+
 def search_users(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[User]:
     """
     Search users by email or username.
     """
-    return db.query(User).filter(
-        (User.email.contains(query)) | (User.username.contains(query))
-    ).offset(skip).limit(limit).all()
+    return db.query(User).filter(_like_filter(query)).order_by(User.id).offset(skip).limit(limit).all()
+
+
+def search_users_page(
+    db: Session,
+    query: str,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    mode: str = "auto",
+) -> Tuple[List[User], Optional[str]]:
+    """
+    Search users by email or username, one page at a time.
+
+    In `auto` mode results come ranked from the full-text index when one exists. Queries the
+    index cannot answer (no index, or no hits on the first page, e.g. a match in the middle
+    of a word) fall back to the substring search ordered by id, which `like` mode forces.
+    """
+    if mode == "auto" and (cursor is None or is_offset_cursor(cursor)):
+        ranked = _ranked_search(db, query)
+        if ranked is not None:
+            users, next_cursor = offset_page(ranked, limit, cursor=cursor, skip=skip)
+            if users or cursor or skip:
+                return users, next_cursor
+    if cursor and is_offset_cursor(cursor):
+        raise InvalidCursor("Cursor does not belong to this search mode.")
+    users = db.query(User).filter(_like_filter(query))
+    return keyset_page(users, [User.id], limit, cursor=cursor, skip=skip)
 
 
 def get_users_count(db: Session) -> int:
     """
     Get total count of users.
     """
-    return db.query(User).count()
+    count = db.query(func.count(User.id)).scalar()
+    _user_count.set("all", count)
+    return count
+
+
+def get_users_count_estimate(db: Session) -> int:
+    """
+    Get the total count of users from a short-lived cache, counting only when it has expired.
+    """
+    count = _user_count.get("all")
+    if count is None:
+        count = get_users_count(db)
+    return count
+
+
+def _adjust_users_count(delta: int) -> None:
+    # Keeps the entry's expiry, so the count is still recounted every USER_COUNT_CACHE_TTL_SECONDS
+    # and picks up writes made by other workers.
+    _user_count.update("all", lambda count: max(count + delta, 0))
+
+
+def search_users_count(db: Session, query: str, mode: str = "auto") -> int:
+    """
+    Get the number of users matching a search, counted the same way `search_users_page` finds them.
+    """
+    if mode == "auto":
+        ranked = _ranked_search(db, query)
+        if ranked is not None:
+            count = ranked.order_by(None).with_entities(func.count(User.id)).scalar()
+            if count:
+                return count
+    return db.query(func.count(User.id)).filter(_like_filter(query)).scalar()
 
 
 def activate_user(db: Session, user_id: int) -> Optional[User]:
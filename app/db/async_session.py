@@ -0,0 +1,65 @@
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.pool import TimedAsyncAdaptedQueuePool
+from app.db.query_stats import instrument
+from app.db.session import apply_sqlite_pragmas, engine_options, is_memory_sqlite
+
+# Async drivers used when ASYNC_DATABASE_URL is not set explicitly.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+
+
+def async_database_url(database_url: str) -> str:
+    """
+    Derive the async driver URL from a sync database URL, e.g. sqlite:// -> sqlite+aiosqlite://.
+    """
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases.")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Get the async engine, creating it on first use so the async drivers are only
+    imported when USE_ASYNC_DB is enabled.
+    """
+    global _engine, _sessionmaker
+    if _engine is None:
+        database_url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+        _engine = create_async_engine(database_url, **engine_options(database_url, TimedAsyncAdaptedQueuePool))
+        instrument(_engine.sync_engine)
+        url = _engine.url
+        if url.get_backend_name() == "sqlite" and not is_memory_sqlite(url):
+            event.listen(_engine.sync_engine, "connect", apply_sqlite_pragmas)
+        _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False, autoflush=False)
+    return _engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """
+    Open a new AsyncSession bound to the async engine.
+    """
+    get_async_engine()
+    return _sessionmaker()
+
+
+async def dispose_async_engine() -> None:
+    """
+    Close all pooled async connections, e.g. on application shutdown.
+    """
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = None
+        _sessionmaker = None
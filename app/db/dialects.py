@@ -0,0 +1,52 @@
+from typing import Dict, Iterable, List
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def dialect_insert(db: Session, table: Table):
+    """
+    Build an INSERT for the session's dialect, which supports ON CONFLICT clauses.
+
+    Raises:
+        NotImplementedError: On databases other than SQLite and Postgres.
+    """
+    name = db.get_bind().dialect.name
+    if name not in _INSERTS:
+        raise NotImplementedError(f"ON CONFLICT is not supported on {name}.")
+    return _INSERTS[name](table)
+
+
+def upsert(db: Session, table: Table, values: Dict, index_elements: List[str], update: Iterable[str]):
+    """
+    Build an INSERT that updates the `update` columns when a row with the same key exists.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        table (Table): The target table.
+        values (Dict): Column values of the row.
+        index_elements (List[str]): Columns of the unique index that identifies the row.
+        update (Iterable[str]): Columns overwritten on conflict.
+    """
+    stmt = dialect_insert(db, table).values(**values)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: stmt.excluded[column] for column in update},
+    )
+
+
+def insert_ignore(db: Session, table: Table, index_elements: List[str]):
+    """
+    Build an INSERT that skips rows conflicting on a unique index instead of failing.
+
+    Add the rows with `.values()` or `.from_select()`; with `.returning()` only the rows
+    actually inserted come back.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        table (Table): The target table or mapped class.
+        index_elements (List[str]): Columns of the unique index that identifies a row.
+    """
+    return dialect_insert(db, table).on_conflict_do_nothing(index_elements=index_elements)
@@ -0,0 +1,86 @@
+import threading
+import time
+from typing import Dict, Optional
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class CheckoutStats:
+    """
+    Thread-safe counters of how long requests waited to check out a pooled connection.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += waited
+            if waited > self.wait_seconds_max:
+                self.wait_seconds_max = waited
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+checkout_stats = CheckoutStats()
+
+
+class _TimedCheckout:
+    """
+    Pool mixin that records the time spent waiting for a connection in `checkout_stats`.
+
+    The wait includes opening a new connection when the pool has spare capacity, and
+    blocking for a returned connection when it is exhausted.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            checkout_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        checkout_stats.record(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """
+    QueuePool recording checkout wait times, used by the sync engine.
+    """
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool recording checkout wait times, used by the async engine.
+    """
+
+
+def pool_stats(pool: Optional[Pool]) -> Dict[str, float]:
+    """
+    Report the current occupancy of a pool together with the checkout wait counters.
+    """
+    stats = dict(checkout_stats.snapshot())
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "checked_in": pool.checkedin(),
+        })
+    return stats
@@ -0,0 +1,194 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+
+@dataclass
+class RequestQueryStats:
+    """
+    SQL statements executed while handling one request.
+    """
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Get the statements executed at least `threshold` times, the usual sign of an N+1 pattern.
+        """
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised in strict mode when a request runs more statements than its route's budget.
+    """
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    """
+    Get the statistics of the request being handled, None outside of a request.
+    """
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(context):
+    # Keep the start-time stack balanced when a statement fails.
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument(engine: Engine) -> None:
+    """
+    Count every statement run on an engine (use `async_engine.sync_engine` for async engines).
+    """
+    if getattr(engine, "_query_stats_instrumented", False):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    engine._query_stats_instrumented = True
+
+
+class RouteTotals:
+    """
+    Process-wide per-route totals, exported by `app.services.metrics.refresh` as Prometheus counters.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def add(self, method: str, route: str, stats: RequestQueryStats, n_plus_one: bool, over_budget: bool) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(
+                (method, route),
+                {"requests": 0, "queries": 0, "db_seconds": 0.0, "n_plus_one": 0, "over_budget": 0},
+            )
+            totals["requests"] += 1
+            totals["queries"] += stats.count
+            totals["db_seconds"] += stats.seconds
+            totals["n_plus_one"] += int(n_plus_one)
+            totals["over_budget"] += int(over_budget)
+
+    def snapshot(self) -> Dict[Tuple[str, str], Dict[str, float]]:
+        with self._lock:
+            return {key: dict(value) for key, value in self._totals.items()}
+
+
+route_totals = RouteTotals()
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    Declare the most SQL statements a route may run per request.
+
+    Place it below the router decorator so the route registers the annotated function::
+
+        @router.get("/courses/{slug}/tree")
+        @query_budget(4)
+        def get_course_tree(...): ...
+    """
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.__query_budget__ = max_queries
+        return endpoint
+    return decorator
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware that counts the SQL statements and database time of each HTTP request.
+
+    - With QUERY_DEBUG_HEADERS, responses carry X-DB-Query-Count, X-DB-Time-Ms and
+      X-DB-Repeated-Statements.
+    - Statements repeated QUERY_N_PLUS_ONE_THRESHOLD times or more are logged as a likely N+1.
+    - Routes decorated with `query_budget` are checked against their budget; with
+      QUERY_BUDGET_STRICT the request fails instead of only being logged, which is meant
+      for test runs.
+    - Per-route totals are accumulated in `route_totals` for the metrics endpoint.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+        flags = {"n_plus_one": False, "over_budget": False}
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                self._check(scope, stats, flags)
+                if settings.QUERY_DEBUG_HEADERS:
+                    repeated = stats.repeated(settings.QUERY_N_PLUS_ONE_THRESHOLD)
+                    headers = list(message.get("headers", []))
+                    headers += [
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-time-ms", f"{stats.seconds * 1000:.2f}".encode()),
+                        (b"x-db-repeated-statements", str(len(repeated)).encode()),
+                    ]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                route_totals.add(scope["method"], route.path, stats, flags["n_plus_one"], flags["over_budget"])
+
+    def _check(self, scope, stats: RequestQueryStats, flags: dict) -> None:
+        route = scope.get("route")
+        route_path = route.path if route is not None else scope["path"]
+
+        repeated = stats.repeated(settings.QUERY_N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            flags["n_plus_one"] = True
+            statement, count = repeated[0]
+            logger.warning(
+                "Possible N+1 on %s %s: statement ran %d times: %s",
+                scope["method"], route_path, count, " ".join(statement.split())[:200],
+            )
+
+        budget = getattr(scope.get("endpoint"), "__query_budget__", None)
+        if budget is not None and stats.count > budget:
+            flags["over_budget"] = True
+            message = f"{scope['method']} {route_path} ran {stats.count} SQL statements, budget is {budget}."
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
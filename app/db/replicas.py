@@ -0,0 +1,138 @@
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
+from fastapi import Request, Response
+from itsdangerous import BadSignature, TimestampSigner
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db.session import SessionLocal, create_app_engine
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Set on the client after a write, so its next reads go to the primary on whichever worker serves them.
+STICKY_COOKIE = "db_primary"
+
+
+@lru_cache(maxsize=None)
+def _sticky_signer() -> TimestampSigner:
+    """
+    Build the signer of the sticky cookie on first use, with the key that signs access tokens.
+    """
+    # Imported here: app.dependencies imports this module, and reads SECRET_KEY after the .env file is loaded.
+    from app.dependencies import SECRET_KEY
+    if not SECRET_KEY:
+        raise RuntimeError("SECRET_KEY must be set to sign the replica sticky cookie.")
+    return TimestampSigner(SECRET_KEY, salt="replica-sticky")
+
+
+class ReplicaSet:
+    """
+    Round-robin selection over read replicas that skips replicas which recently failed.
+
+    A replica is taken out of rotation for `retry_after` seconds when it raises a
+    disconnect or connection error, then tried again.
+    """
+
+    def __init__(self, urls: List[str], retry_after: float) -> None:
+        self.engines: List[Engine] = [create_app_engine(url) for url in urls]
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._next = 0
+        self._down_until: Dict[int, float] = {}
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        # Connection errors (no connection yet) and disconnects mean the replica is unusable.
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+    def mark_down(self, engine: Engine) -> None:
+        """
+        Take a replica out of rotation for `retry_after` seconds.
+        """
+        with self._lock:
+            self._down_until[id(engine)] = time.monotonic() + self.retry_after
+
+    def candidates(self) -> List[Engine]:
+        """
+        Get the healthy replicas, starting with the next one in round-robin order.
+        """
+        now = time.monotonic()
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.engines)
+            ordered = self.engines[start:] + self.engines[:start]
+            return [engine for engine in ordered if self._down_until.get(id(engine), 0) <= now]
+
+    def healthy_count(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            return sum(1 for engine in self.engines if self._down_until.get(id(engine), 0) <= now)
+
+
+def _parse_urls(value: str) -> List[str]:
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+_replica_urls = _parse_urls(settings.DATABASE_REPLICA_URLS)
+replica_set: Optional[ReplicaSet] = (
+    ReplicaSet(_replica_urls, settings.REPLICA_RETRY_AFTER_SECONDS) if _replica_urls else None
+)
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+
+def note_write(response: Response) -> None:
+    """
+    Pin the caller's reads to the primary for REPLICA_STICKY_SECONDS after a successful write.
+
+    The deadline travels with the client as a signed, timestamped cookie rather than in this
+    process, so it holds whichever worker serves the following reads.
+    """
+    response.set_cookie(
+        STICKY_COOKIE,
+        _sticky_signer().sign("1").decode(),
+        max_age=settings.REPLICA_STICKY_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+
+
+def _is_sticky(request: Request) -> bool:
+    value = request.cookies.get(STICKY_COOKIE)
+    if not value:
+        return False
+    try:
+        _sticky_signer().unsign(value, max_age=settings.REPLICA_STICKY_SECONDS)
+    except BadSignature:
+        return False
+    return True
+
+
+def read_session(request: Request) -> Session:
+    """
+    Open a session for a read-only request handler.
+
+    Uses the next healthy replica, falling back to the other replicas and finally to the
+    primary when a replica cannot be reached. Callers that wrote recently, and every
+    caller when no replica is configured, get a primary session.
+    """
+    if replica_set is None or _is_sticky(request):
+        return SessionLocal()
+
+    for engine in replica_set.candidates():
+        db = ReadSessionLocal(bind=engine)
+        try:
+            db.connection()
+        except DBAPIError:
+            db.close()
+            replica_set.mark_down(engine)
+            continue
+        return db
+    return SessionLocal()
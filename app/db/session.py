@@ -1,8 +1,68 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.pool import TimedQueuePool
+from app.db.query_stats import instrument
 
-engine = create_engine(settings.DATABASE_URL)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(database_url: str, poolclass=TimedQueuePool) -> dict:
+    """
+    Build the create_engine keyword arguments for a database URL from the pool settings.
+
+    In-memory SQLite keeps SQLAlchemy's default single-connection pool, since every new
+    connection would otherwise see a different empty database.
+    """
+    url = make_url(database_url)
+    if is_memory_sqlite(url):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Tune every new SQLite connection for concurrent web traffic.
+
+    WAL lets readers run alongside a writer, busy_timeout makes writers wait for the lock
+    instead of failing with "database is locked", and synchronous=NORMAL is safe under WAL.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA temp_store={settings.SQLITE_TEMP_STORE}")
+    finally:
+        cursor.close()
+
+
+def create_app_engine(database_url: str):
+    """
+    Create an engine with the configured pool, statement counting and, on SQLite files, the pragma profile.
+    """
+    engine = create_engine(database_url, **engine_options(database_url))
+    instrument(engine)
+    url = engine.url
+    if url.get_backend_name() == "sqlite" and not is_memory_sqlite(url):
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    return engine
+
+
+engine = create_app_engine(settings.DATABASE_URL)
+
+# Writes load their rows with RETURNING, so objects stay usable after commit without re-querying.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
@@ -0,0 +1,115 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+ALEMBIC_INI = PROJECT_ROOT / "alembic.ini"
+VERSIONS_DIR = PROJECT_ROOT / "alembic" / "versions"
+
+
+class SchemaMismatch(RuntimeError):
+    """
+    Raised at startup when the database is not at the Alembic head revision.
+    """
+
+
+def migrations_fingerprint() -> str:
+    """
+    Hash the names, sizes and modification times of the migration scripts.
+
+    Changes whenever a migration is added, removed or edited, which is when the cached
+    head revision must be recomputed.
+    """
+    digest = hashlib.sha1()
+    for entry in sorted(os.scandir(VERSIONS_DIR), key=lambda e: e.name):
+        if entry.name.endswith(".py"):
+            stat = entry.stat()
+            digest.update(f"{entry.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def _read_stamp(path: Path, fingerprint: str) -> Optional[str]:
+    try:
+        stamped_fingerprint, head = path.read_text().split()
+    except (OSError, ValueError):
+        return None
+    return head if stamped_fingerprint == fingerprint else None
+
+
+def _write_stamp(path: Path, fingerprint: str, head: str) -> None:
+    try:
+        path.write_text(f"{fingerprint} {head}\n")
+    except OSError:
+        pass  # read-only deployments just recompute the head on every boot
+
+
+def expected_head() -> str:
+    """
+    Get the Alembic head revision, reading the migration scripts only when they changed.
+
+    Alembic is imported here rather than at module level so that boots served from the
+    stamp file never import it.
+    """
+    stamp = Path(settings.SCHEMA_STAMP_FILE)
+    if not stamp.is_absolute():
+        stamp = PROJECT_ROOT / stamp
+    fingerprint = migrations_fingerprint()
+    head = _read_stamp(stamp, fingerprint)
+    if head is None:
+        from alembic.config import Config
+        from alembic.script import ScriptDirectory
+
+        heads = ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads()
+        if len(heads) != 1:
+            raise SchemaMismatch(f"Expected a single Alembic head, found {len(heads)}: {', '.join(heads)}.")
+        head = heads[0]
+        _write_stamp(stamp, fingerprint, head)
+    return head
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    """
+    Read the revision recorded in the database's alembic_version table, None if it has none.
+    """
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except DBAPIError:
+        return None
+
+
+def validate_schema(engine: Engine) -> str:
+    """
+    Check that the database has been migrated to the Alembic head revision.
+
+    Returns:
+        str: The head revision.
+
+    Raises:
+        SchemaMismatch: If the database is at another revision or was never migrated.
+    """
+    head = expected_head()
+    revision = current_revision(engine)
+    if revision != head:
+        raise SchemaMismatch(
+            f"Database schema is at revision {revision or 'none'}, expected {head}. Run `alembic upgrade head`."
+        )
+    return head
+
+
+def prepare_database(engine: Engine, mode: str) -> None:
+    """
+    Get the database ready according to DB_STARTUP_MODE.
+    """
+    if mode == "create_all":
+        from app.db.init_db import init_db
+
+        init_db()
+    elif mode == "validate":
+        validate_schema(engine)
@@ -0,0 +1,64 @@
+from typing import Any, Dict, Iterable, Optional, Type
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+
+def _returning_supported(db: Session, kind: str) -> bool:
+    return getattr(db.get_bind().dialect, f"{kind}_returning", False)
+
+
+def insert_returning(db: Session, model: Type, values: Dict[str, Any], empty: Iterable[str] = ()):
+    """
+    Insert one row and get it back as a fully loaded instance from the same statement.
+
+    Uses INSERT ... RETURNING on Postgres and SQLite 3.35+, so the new row needs no refresh
+    after commit; other databases fall back to a plain add and flush.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        model (Type): The mapped class to insert.
+        values (Dict[str, Any]): Column values of the row.
+        empty (Iterable[str]): Collection relationships known to be empty on a new row, marked
+            loaded so serializing them does not query.
+
+    Returns:
+        The new instance, attached to the session.
+    """
+    if _returning_supported(db, "insert"):
+        obj = db.scalars(insert(model).returning(model), [values]).one()
+    else:
+        obj = model(**values)
+        db.add(obj)
+        db.flush()
+    for name in empty:
+        set_committed_value(obj, name, [])
+    return obj
+
+
+def update_returning(db: Session, model: Type, criteria: Iterable, values: Dict[str, Any]):
+    """
+    Update the row matching `criteria` and get it back as a fully loaded instance from the same statement.
+
+    Uses UPDATE ... RETURNING where supported, so a missing row and the updated state come from a
+    single round-trip; an instance already in the session is refreshed in place. With no `values`
+    the row is only selected.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        model (Type): The mapped class to update.
+        criteria (Iterable): WHERE clauses selecting a single row, e.g. on a unique column.
+        values (Dict[str, Any]): Column values or SQL expressions to set.
+
+    Returns:
+        The updated instance, or None if no row matched.
+    """
+    criteria = list(criteria)
+    if values and _returning_supported(db, "update"):
+        return db.scalars(update(model).where(*criteria).values(values).returning(model)).first()
+    obj: Optional[Any] = db.query(model).filter(*criteria).first()
+    if obj is not None and values:
+        for key, value in values.items():
+            setattr(obj, key, value)
+        db.flush()
+    return obj
@@ -1,10 +1,16 @@
 import os
+from dataclasses import dataclass
+from typing import FrozenSet
 from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.models.user import User
 from app.api import deps
+from app.services import permission_cache
+from app.crud import async_account as asyncAccountCrud
 
 SECRET_KEY = os.getenv("SECRET_KEY", "rwf3qx4f_y8WvTHStV-qELvas_jziuw6AU9hR15l3Vk")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
@@ -12,42 +18,126 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
 
 security = HTTPBearer()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(deps.get_db)
-) -> User:
-    token = credentials.credentials 
-    credentials_exception = HTTPException(
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated caller, resolved either from token claims or from the users table.
+    """
+    id: int
+    email: str
+    role_ids: FrozenSet[int]
+    permissions: FrozenSet[str]
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_email: str = payload.get("sub")
-        if user_email is None:
-            raise credentials_exception
-        
-        user = db.query(User).filter(User.email == user_email).first()
-        if user is None:
-            raise credentials_exception
-            
-        return user
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+
+def _load_user(db: Session, payload: dict) -> User:
+    user = db.query(User).filter(User.email == payload["sub"]).first()
+    if user is None:
+        raise _credentials_exception()
+    return user
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(deps.get_db)
+) -> User:
+    payload = _decode_token(credentials.credentials)
+    return _load_user(db, payload)
+
+
+def get_current_user_read(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(deps.get_read_db)
+) -> User:
+    """
+    Same as `get_current_user`, loading the user through the read-replica session.
+    """
+    payload = _decode_token(credentials.credentials)
+    return _load_user(db, payload)
+
+
+def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(deps.get_db)
+) -> Principal:
+    """
+    Resolve the caller without loading the user row when the token embeds authorization claims.
+
+    Embedded claims are trusted only while the token's `av` still matches the user's
+    authz_version; otherwise the caller is resolved from the database as for plain tokens.
+    """
+    payload = _decode_token(credentials.credentials)
+    return _resolve_principal(db, payload)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> User:
+    payload = _decode_token(credentials.credentials)
+    user = await asyncAccountCrud.get_user_by_email(db, payload["sub"])
+    if user is None:
+        raise _credentials_exception()
+    return user
+
+
+async def get_current_principal_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(deps.get_async_db)
+) -> Principal:
+    """
+    Async counterpart of `get_current_principal`, sharing its caches through AsyncSession.run_sync.
+    """
+    payload = _decode_token(credentials.credentials)
+    return await db.run_sync(lambda session: _resolve_principal(session, payload))
+
+
+def _resolve_principal(db: Session, payload: dict) -> Principal:
+    user_id = payload.get("uid")
+    if settings.ACCESS_TOKEN_EMBED_AUTHZ and user_id is not None and "av" in payload:
+        if permission_cache.get_authz_version(db, user_id) == payload["av"]:
+            return Principal(
+                id=user_id,
+                email=payload["sub"],
+                role_ids=frozenset(payload.get("rid", [])),
+                permissions=permission_cache.decode_permission_bitmap(db, payload.get("pm")),
+            )
+
+    user = _load_user(db, payload)
+    return Principal(
+        id=user.id,
+        email=user.email,
+        role_ids=permission_cache.get_user_role_ids(db, user.id, user.authz_version),
+        permissions=permission_cache.get_user_permissions(db, user.id, user.authz_version),
+    )
 
 
 def has_permission(permission_name: str):
     def permission_checker(
-        current_user: User = Depends(get_current_user),
-        db: Session = Depends(deps.get_db)
+        current_user: Principal = Depends(get_current_principal),
     ):
-        for role in current_user.roles:
-            for perm in role.permissions:
-                if perm.name == permission_name:
-                    return current_user
+        if permission_name in current_user.permissions:
+            return current_user
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You don't have permission"
         )
-    return permission_checker
\ No newline at end of file
+    return permission_checker
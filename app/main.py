@@ -1,20 +1,90 @@
-from fastapi import FastAPI
-from app.api.api_v1 import courses, user, account, chapters, lectures, roles, permissions
-from app.db.init_db import init_db
-from starlette.middleware.sessions import SessionMiddleware
+import logging
+import time
+
+_boot_started = time.perf_counter()
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from app.api.api_v1 import courses, user, account, chapters, lectures, roles, permissions, search, async_catalog
+from app.api import metrics as metrics_api
+from app.core.config import settings
+from app.core.sessions import PathSessionMiddleware
+from app.core.timing import PhaseTimer
+from app.db.session import engine
+from app.db.startup import prepare_database
+from app.db.query_stats import QueryStatsMiddleware
+from app.db.async_session import dispose_async_engine
+from app.db import replicas
+from app.services import metrics
+from app.services.hash_password import HashPoolSaturated
+from app.services.idempotency import IdempotencyError
+from app.services import otp_store
+from app.services.pagination import InvalidCursor
 
 app = FastAPI(title="Edu Platform")
 
-app.add_middleware(SessionMiddleware, secret_key="YOUR_SECRET_KEY_HERE")
+# Only the signup flow uses the session; other routes never touch the cookie.
+app.add_middleware(PathSessionMiddleware, secret_key="YOUR_SECRET_KEY_HERE", path="/api/v1/accounts")
+# Added first so it runs inside QueryStatsMiddleware and can read the request's statement count.
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+
+
+if replicas.replica_set is not None:
+    @app.middleware("http")
+    async def read_your_writes(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in replicas.READ_METHODS and response.status_code < 400:
+            replicas.note_write(response)
+        return response
+
+
+@app.exception_handler(HashPoolSaturated)
+def hash_pool_saturated_handler(request: Request, exc: HashPoolSaturated):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Authentication service is busy, please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(InvalidCursor)
+def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
 
+
+@app.exception_handler(IdempotencyError)
+def idempotency_error_handler(request: Request, exc: IdempotencyError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
+
+
+if settings.USE_ASYNC_DB:
+    app.include_router(async_catalog.router, prefix="/api/v1")
 app.include_router(user.router, prefix="/api/v1/users", tags=["Users"])
 app.include_router(account.router, prefix="/api/v1/accounts", tags=["Accounts"])
 app.include_router(courses.router, prefix="/api/v1", tags=["Courses"])
 app.include_router(chapters.router, prefix="/api/v1", tags=["Chapters"])
 app.include_router(lectures.router, prefix="/api/v1", tags=["Lectures"])
+app.include_router(search.router, prefix="/api/v1", tags=["Search"])
 app.include_router(roles.router, prefix="/api/v1/roles", tags=["Roles"])
 app.include_router(permissions.router, prefix="/api/v1/permissions", tags=["Permissions"])
+app.include_router(metrics_api.router)
+
+startup_timer = PhaseTimer(started=_boot_started)
+startup_timer.mark("app_import", _boot_started)
+
 
 @app.on_event("startup")
 def on_startup():
-    init_db()
\ No newline at end of file
+    with startup_timer.phase(f"database_{settings.DB_STARTUP_MODE}"):
+        prepare_database(engine, settings.DB_STARTUP_MODE)
+    otp_store.start_sweeper()
+    app.state.startup_timings = startup_timer.report()
+    logging.getLogger("uvicorn.error").info("Startup timings (ms): %s", app.state.startup_timings)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    otp_store.stop_sweeper()
+    await dispose_async_engine()
+    metrics.mark_process_dead()
\ No newline at end of file
@@ -1,19 +1,19 @@
-from sqlalchemy import Column, Integer, String, DateTime, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Table, ForeignKey, Index
 from app.db.base_class import Base
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 role_permission = Table(
     'role_permission', Base.metadata,
-    Column('role_id', Integer, ForeignKey('roles.id')),
-    Column('permission_id', Integer, ForeignKey('permissions.id'))
+    Column('role_id', Integer, ForeignKey('roles.id'), primary_key=True),
+    Column('permission_id', Integer, ForeignKey('permissions.id'), primary_key=True)
 )
 
 
 user_role = Table(
     'user_role', Base.metadata,
-    Column('user_id', Integer, ForeignKey('users.id')),
-    Column('role_id', Integer, ForeignKey('roles.id')),
+    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
+    Column('role_id', Integer, ForeignKey('roles.id'), primary_key=True),
     extend_existing=True
 ) 
 
@@ -48,11 +48,36 @@ class UserRegisteredCourse(Base):
     course_id = Column(Integer, ForeignKey('courses.id'), nullable=False)
     registered_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        Index('ix_user_registered_courses_user_course', 'user_id', 'course_id', unique=True),
+    )
+
 
 class OtpCode(Base):
     __tablename__ = "otp_codes"
 
     id = Column(Integer, primary_key=True, index=True)
-    email = Column(String(255), nullable=False, index=True)
+    email = Column(String(255), nullable=False, unique=True, index=True)
     code = Column(String(6), nullable=False)
+    challenge_id = Column(String(64), nullable=True, unique=True, index=True)
+    # JSON kept with the challenge until the code is verified, e.g. the pending signup.
+    data = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True)
+    # Owner of the key, e.g. "<user id>:<route>", so keys of different clients never collide.
+    scope = Column(String(255), nullable=False)
+    key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    # NULL while the first request with the key is still running.
+    status_code = Column(Integer, nullable=True)
+    body = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        Index('ix_idempotency_keys_scope_key', 'scope', 'key', unique=True),
+    )
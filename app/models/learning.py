@@ -10,7 +10,7 @@ class Course(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
     full_name = Column(String, nullable=True)
-    slug = Column(String)
+    slug = Column(String, unique=True, index=True)
     lecturer = Column(String, nullable=True)
     language = Column(String, nullable=True)
     is_free = Column(Boolean, default=False)
@@ -25,9 +25,10 @@ class Chapter(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
-    slug = Column(String)
+    slug = Column(String, unique=True, index=True)
     is_free = Column(Boolean, default=False)
-    course_id = Column(Integer, ForeignKey("courses.id"))
+    course_id = Column(Integer, ForeignKey("courses.id"), index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     course = relationship("Course", back_populates="chapters")
     lectures = relationship("Lecture", back_populates="chapter", cascade="all, delete-orphan")
 
@@ -37,12 +38,24 @@ class Lecture(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
-    slug = Column(String)
+    slug = Column(String, unique=True, index=True)
     time = Column(Time, nullable=True)
     is_free = Column(Boolean, default=False)
     video_url = Column(String, nullable=True)
     drive_url = Column(String, nullable=True)
     youtube_url = Column(String, nullable=True)
-    chapter_id = Column(Integer, ForeignKey("chapters.id"))
+    chapter_id = Column(Integer, ForeignKey("chapters.id"), index=True)
+    # Copy of chapter.course_id, kept in sync by crud.lectures and crud.chapters.update_chapter.
+    course_id = Column(Integer, ForeignKey("courses.id", name="fk_lectures_course_id_courses"), index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     chapter = relationship("Chapter", back_populates="lectures")
 
+
+class CatalogVersion(Base):
+    """
+    Content version of a cached catalog list, bumped in the transaction of every write to it.
+    """
+    __tablename__ = "catalog_versions"
+
+    resource = Column(String(32), primary_key=True)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
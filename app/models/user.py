@@ -1,13 +1,7 @@
-from sqlalchemy import Column, Integer, String, Boolean, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean
 from app.db.base_class import Base
 from sqlalchemy.orm import relationship
-
-user_role = Table(
-    'user_role', Base.metadata,
-    Column('user_id', Integer, ForeignKey('users.id')),
-    Column('role_id', Integer, ForeignKey('roles.id')),
-    extend_existing=True
-) 
+from app.models.account import user_role
 
 class User(Base):
     __tablename__ = "users"
@@ -17,4 +11,6 @@ class User(Base):
     username = Column(String, nullable=True)
     password = Column(String, nullable=True)
     is_registered = Column(Boolean, default=False)
+    authz_version = Column(Integer, nullable=False, default=0, server_default="0")
+    enrollment_version = Column(Integer, nullable=False, default=0, server_default="0")
     roles = relationship('Role', secondary=user_role)
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, constr, validator
-from typing import List
+from pydantic import BaseModel, conlist, constr, validator
+from typing import List, Optional
 from datetime import datetime
 
 email_pattern = r'^[\w\.-]+@[\w\.-]+\.\w{2,}$'
@@ -20,6 +20,8 @@ class SignUp(BaseModel):
 class Register(BaseModel):
     email: constr(pattern=email_pattern)
     code: constr(min_length=6, max_length=6)
+    # Returned by /signup; clients that omit it fall back to the signup session cookie.
+    challenge_id: Optional[constr(max_length=64)] = None
 
 
 class Login(BaseModel):
@@ -90,4 +92,13 @@ class UserRegisteredCourseOut(UserRegisteredCourseBase):
     registered_at: datetime
     
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+
+class BulkRegisterCourse(UserRegisteredCourseBase):
+    user_ids: conlist(int, min_length=1, max_length=1000)
+
+
+class BulkRegisterCourseOut(UserRegisteredCourseBase):
+    registered: List[int]
+    skipped: List[int]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, conlist
+from typing import List, Literal, Optional
 import datetime
 
 class CreateCourse(BaseModel):
@@ -29,7 +29,8 @@ class RetrieveCourse(BaseModel):
     language: Optional[str] = None
     is_free: bool
     description: Optional[str] = None
-    updated_at: datetime.datetime
+    # NULL for courses created before updated_at was tracked
+    updated_at: Optional[datetime.datetime] = None
 
     class Config:
         orm_mode = True
@@ -95,3 +96,32 @@ class RetrieveLecture(BaseModel):
         orm_mode = True
 
 
+class LectureTreeItem(BaseModel):
+    id: int
+    title: str
+    slug: str
+    time: Optional[datetime.time] = None
+    is_free: bool
+
+    class Config:
+        orm_mode = True
+
+
+class ChapterTree(RetrieveChapter):
+    lectures: List[LectureTreeItem] = []
+    total_time_seconds: int = 0
+
+
+class CourseTree(RetrieveCourse):
+    chapters: List[ChapterTree] = []
+    total_time_seconds: int = 0
+
+
+class LectureAccessRequest(BaseModel):
+    slugs: conlist(str, min_length=1, max_length=100)
+
+
+class LectureAccess(BaseModel):
+    slug: str
+    allowed: bool
+    reason: Literal["free", "enrolled", "not_enrolled", "not_found"]
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+
+class SearchHit(BaseModel):
+    kind: Literal["course", "lecture"]
+    id: int
+    title: str
+    slug: str
+    is_free: bool
+    language: Optional[str] = None
+    course_slug: Optional[str] = None
+
+
+class SearchResponse(BaseModel):
+    results: List[SearchHit]
+    next_cursor: Optional[str] = None
@@ -81,9 +81,10 @@ class UserSearch(BaseModel):
 
 class UsersResponse(BaseModel):
     users: List[UserListOut]
-    total: int
+    total: Optional[int] = None
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
 
 
 class UserActivation(BaseModel):
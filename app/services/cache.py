@@ -0,0 +1,132 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with a per-entry TTL and an LRU size bound.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            name (str): Cache name, used when reporting hit/miss statistics.
+            maxsize (int): Maximum number of entries kept before evicting the least recently used one.
+            ttl (float): Lifetime of an entry in seconds.
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value for a key, or `default` if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry when the cache is full.
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for a key, calling `loader` to fill it on a miss.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def update(self, key: Hashable, func: Callable[[Any], Any]) -> None:
+        """
+        Replace a live entry's value with `func(value)`, keeping its original expiry.
+
+        Missing or expired entries are left alone, so adjusting a value never postpones its reload.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] > time.monotonic():
+                self._data[key] = (entry[0], func(entry[1]))
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Drop a single entry if present.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """
+        Drop every entry whose key matches the predicate.
+        """
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        """
+        Drop all entries.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit/miss counters and the current size of the cache.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+_registry: Dict[str, TTLCache] = {}
+
+
+def create_cache(name: str, maxsize: int = 1024, ttl: float = 60.0) -> TTLCache:
+    """
+    Create a named cache and register it so its statistics can be reported.
+    """
+    cache = TTLCache(name, maxsize=maxsize, ttl=ttl)
+    _registry[name] = cache
+    return cache
+
+
+def get_cache(name: str) -> Optional[TTLCache]:
+    """
+    Return a registered cache by name.
+    """
+    return _registry.get(name)
+
+
+def all_caches() -> Dict[str, TTLCache]:
+    """
+    Return all registered caches keyed by name.
+    """
+    return dict(_registry)
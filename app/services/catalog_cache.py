@@ -0,0 +1,135 @@
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Awaitable, Callable, Iterable, List
+from pydantic import TypeAdapter
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import dialects
+from app.models.learning import CatalogVersion
+from app.services.cache import create_cache
+
+RESOURCES = ("courses", "chapters", "lectures")
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """
+    A serialized resource list together with its ETag.
+
+    Lists carry no Last-Modified: the newest updated_at of the remaining rows does not move
+    when a row is deleted or moved away, so If-Modified-Since would answer 304 to stale copies.
+    """
+    body: bytes
+    etag: str
+
+
+# (resource, version) -> CatalogEntry; a bump makes older versions unreachable
+_entries = create_cache("catalog", maxsize=64, ttl=settings.CATALOG_CACHE_TTL_SECONDS)
+
+
+def _version_query(resource: str):
+    return select(CatalogVersion.version).where(CatalogVersion.resource == resource)
+
+
+def current_version(db: Session, resource: str) -> int:
+    """
+    Get the current content version of a catalog resource from the catalog_versions table.
+
+    The version is shared by every worker, so a write made through one of them stops the
+    others from serving, or answering 304 to, the list they cached before it.
+    """
+    return db.scalar(_version_query(resource)) or 0
+
+
+async def current_version_async(db: AsyncSession, resource: str) -> int:
+    """
+    Async version of `current_version`.
+    """
+    return await db.scalar(_version_query(resource)) or 0
+
+
+def bump(db: Session, *resources: str) -> None:
+    """
+    Invalidate cached entries of the given resources after their content changed. Call before committing.
+    """
+    result = db.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.resource.in_(resources))
+        .values(version=CatalogVersion.version + 1)
+    )
+    if result.rowcount < len(resources):
+        # Databases built with create_all have no version rows yet.
+        db.execute(
+            dialects.insert_ignore(db, CatalogVersion.__table__, ["resource"])
+            .values([{"resource": resource, "version": 1} for resource in resources])
+        )
+    _entries.discard_where(lambda key: key[0] in resources)
+
+
+def put(resource: str, version: int, entry: CatalogEntry) -> None:
+    """
+    Store the entry built for a resource at a given version.
+
+    The version must be read before the data was loaded, so an entry built while a
+    write was bumping the version is stored under the old version and never served.
+    """
+    _entries.set((resource, version), entry)
+
+
+def build_entry(schema, objects: Iterable) -> CatalogEntry:
+    """
+    Serialize ORM objects with a response schema and compute the list's ETag.
+    """
+    body = dump_models(schema, objects)
+    return CatalogEntry(body=body, etag=f'"{hashlib.sha1(body).hexdigest()}"')
+
+
+def get_or_build(db: Session, resource: str, schema, loader: Callable[[], Iterable]) -> CatalogEntry:
+    """
+    Get the cached entry of a resource, loading and serializing it on a miss.
+
+    Args:
+        db (Session): SQLAlchemy database session, used to read the resource's version.
+        resource (str): One of RESOURCES.
+        schema: Pydantic schema used to serialize each object.
+        loader (Callable): Returns the ORM objects of the resource.
+
+    Returns:
+        CatalogEntry: The serialized list and its validators.
+    """
+    version = current_version(db, resource)
+    entry = _entries.get((resource, version))
+    if entry is None:
+        entry = build_entry(schema, loader())
+        put(resource, version, entry)
+    return entry
+
+
+async def get_or_build_async(
+    db: AsyncSession, resource: str, schema, loader: Callable[[], Awaitable[Iterable]]
+) -> CatalogEntry:
+    """
+    Same as `get_or_build`, with a loader coroutine for async sessions.
+    """
+    version = await current_version_async(db, resource)
+    entry = _entries.get((resource, version))
+    if entry is None:
+        entry = build_entry(schema, await loader())
+        put(resource, version, entry)
+    return entry
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def dump_models(schema, objects: Iterable) -> bytes:
+    """
+    Serialize ORM objects to a JSON array using a Pydantic response schema.
+    """
+    adapter = _list_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(list(objects), from_attributes=True))
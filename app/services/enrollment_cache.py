@@ -0,0 +1,136 @@
+from typing import FrozenSet, Iterable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.account import UserRegisteredCourse
+from app.models.user import User
+from app.services.cache import create_cache
+
+# user_id -> (users.enrollment_version the set was loaded at, frozenset of the ids of the user's courses)
+_enrolled_courses = create_cache(
+    "enrolled_courses",
+    maxsize=settings.ENROLLMENT_CACHE_MAX_SIZE,
+    ttl=settings.ENROLLMENT_CACHE_TTL_SECONDS,
+)
+
+# user_id -> users.enrollment_version, kept short-lived so other workers observe unenrollments quickly
+_enrollment_versions = create_cache(
+    "enrollment_versions",
+    maxsize=settings.ENROLLMENT_CACHE_MAX_SIZE,
+    ttl=settings.ENROLLMENT_VERSION_CACHE_TTL_SECONDS,
+)
+
+
+def _enrollment_query(user_id: int):
+    # The version and the courses come from one statement, so they always match.
+    return (
+        select(User.enrollment_version, UserRegisteredCourse.course_id)
+        .outerjoin(UserRegisteredCourse, UserRegisteredCourse.user_id == User.id)
+        .where(User.id == user_id)
+    )
+
+
+def _version_query(user_id: int):
+    return select(User.enrollment_version).where(User.id == user_id)
+
+
+def _store(user_id: int, rows) -> FrozenSet[int]:
+    version = rows[0].enrollment_version if rows else None
+    course_ids = frozenset(row.course_id for row in rows if row.course_id is not None)
+    _enrollment_versions.set(user_id, version)
+    _enrolled_courses.set(user_id, (version, course_ids))
+    return course_ids
+
+
+def load_enrolled_course_ids(db: Session, user_id: int) -> FrozenSet[int]:
+    """
+    Read the ids of the courses a user is enrolled in from the database and cache them.
+    """
+    return _store(user_id, db.execute(_enrollment_query(user_id)).all())
+
+
+async def load_enrolled_course_ids_async(db: AsyncSession, user_id: int) -> FrozenSet[int]:
+    """
+    Async version of `load_enrolled_course_ids`.
+    """
+    return _store(user_id, (await db.execute(_enrollment_query(user_id))).all())
+
+
+def get_enrolled_course_ids(db: Session, user_id: int, expected: Iterable[int] = ()) -> FrozenSet[int]:
+    """
+    Get the ids of the courses a user is enrolled in, served from cache when warm.
+
+    A cached set lacking any of the `expected` course ids is reloaded once, so an enrollment
+    made through another worker is honoured immediately. Unenrollments bump the user's
+    enrollment_version, which is re-read at least every ENROLLMENT_VERSION_CACHE_TTL_SECONDS
+    and reloads the set when it changed, so other workers stop granting access within that delay.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): The ID of the user.
+        expected (Iterable[int]): Course ids about to be checked against the result.
+
+    Returns:
+        FrozenSet[int]: The ids of the user's courses.
+    """
+    entry = _enrolled_courses.get(user_id)
+    if entry is not None and entry[1].issuperset(expected):
+        version = _enrollment_versions.get_or_set(user_id, lambda: db.scalar(_version_query(user_id)))
+        if version == entry[0]:
+            return entry[1]
+    return load_enrolled_course_ids(db, user_id)
+
+
+async def get_enrolled_course_ids_async(db: AsyncSession, user_id: int, expected: Iterable[int] = ()) -> FrozenSet[int]:
+    """
+    Async version of `get_enrolled_course_ids`.
+    """
+    entry = _enrolled_courses.get(user_id)
+    if entry is not None and entry[1].issuperset(expected):
+        version = _enrollment_versions.get(user_id)
+        if version is None:
+            version = await db.scalar(_version_query(user_id))
+            _enrollment_versions.set(user_id, version)
+        if version == entry[0]:
+            return entry[1]
+    return await load_enrolled_course_ids_async(db, user_id)
+
+
+def is_enrolled(db: Session, user_id: int, course_id: int) -> bool:
+    """
+    Check whether a user is enrolled in a course.
+    """
+    return course_id in get_enrolled_course_ids(db, user_id, (course_id,))
+
+
+async def is_enrolled_async(db: AsyncSession, user_id: int, course_id: int) -> bool:
+    """
+    Async version of `is_enrolled`.
+    """
+    return course_id in await get_enrolled_course_ids_async(db, user_id, (course_id,))
+
+
+def bump_enrollment_version(db: Session, user_id: int) -> None:
+    """
+    Increment a user's enrollment_version so every worker reloads their courses. Call before committing an unenrollment.
+    """
+    db.query(User).filter(User.id == user_id).update(
+        {User.enrollment_version: User.enrollment_version + 1}, synchronize_session=False
+    )
+
+
+def invalidate_user(user_id: int) -> None:
+    """
+    Forget the cached enrollments of a user after they enroll in or leave a course.
+    """
+    _enrolled_courses.pop(user_id)
+    _enrollment_versions.pop(user_id)
+
+
+def invalidate_all() -> None:
+    """
+    Forget all cached enrollments.
+    """
+    _enrolled_courses.clear()
+    _enrollment_versions.clear()
@@ -0,0 +1,131 @@
+import re
+import threading
+from typing import Dict, Iterable, Optional
+from sqlalchemy import literal_column, text
+from sqlalchemy.orm import Session
+
+# FTS5 virtual tables maintained next to their content tables on SQLite. They are created
+# by migrations, not by Base.metadata, so Alembic autogenerate must ignore them.
+FTS_TABLES = ("users_fts", "courses_fts", "lectures_fts")
+
+_lock = threading.Lock()
+_available: Dict[tuple, bool] = {}
+
+
+def dialect_name(db: Session) -> str:
+    """
+    Get the name of the database dialect a session is bound to.
+    """
+    return db.get_bind().dialect.name
+
+
+def index_available(db: Session, name: str) -> bool:
+    """
+    Check once per process whether a full-text table (SQLite) or index (Postgres) exists.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        name (str): FTS5 table name on SQLite, index name on Postgres.
+
+    Returns:
+        bool: True if the search structure exists and can be used.
+    """
+    bind = db.get_bind()
+    key = (str(bind.url), name)
+    if key not in _available:
+        if bind.dialect.name == "sqlite":
+            found = db.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": name}
+            ).first()
+        elif bind.dialect.name == "postgresql":
+            found = db.execute(text("SELECT 1 FROM pg_indexes WHERE indexname = :name"), {"name": name}).first()
+        else:
+            found = None
+        with _lock:
+            _available[key] = found is not None
+    return _available[key]
+
+
+def reset() -> None:
+    """
+    Forget which search structures were found, e.g. after running migrations in-process.
+    """
+    with _lock:
+        _available.clear()
+
+
+def match_expression(query: str, prefix: bool = True) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression: every word must match, optionally as a prefix.
+
+    Words are quoted so user input can never be interpreted as FTS5 query syntax.
+
+    Returns:
+        str or None: The MATCH expression, None if the query contains no searchable words.
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    suffix = "*" if prefix else ""
+    return " ".join(f'"{word}"{suffix}' for word in words)
+
+
+def prefix_tsquery(query: str) -> Optional[str]:
+    """
+    Turn free text into a Postgres tsquery matching every word as a prefix.
+
+    Returns:
+        str or None: The tsquery text, None if the query contains no searchable words.
+    """
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+def matches(table_name: str, expression: str):
+    """
+    Build the `<fts table> MATCH :expression` filter clause.
+    """
+    return literal_column(table_name).op("MATCH")(expression)
+
+
+def rank(table_name: str):
+    """
+    Build the BM25 rank of an FTS5 row; lower is more relevant.
+    """
+    return literal_column(f"bm25({table_name})")
+
+
+def sync_row(db: Session, table_name: str, rowid: int, values: Dict[str, Optional[str]]) -> None:
+    """
+    Insert or replace the indexed copy of a row in an SQLite FTS5 table.
+
+    Does nothing on other backends, whose indexes are maintained by the database itself,
+    or when the FTS table has not been created yet.
+    """
+    if dialect_name(db) != "sqlite" or not index_available(db, table_name):
+        return
+    columns = ", ".join(values)
+    params = ", ".join(f":{column}" for column in values)
+    db.execute(
+        text(f"INSERT OR REPLACE INTO {table_name} (rowid, {columns}) VALUES (:rowid, {params})"),
+        {"rowid": rowid, **{column: value or "" for column, value in values.items()}},
+    )
+
+
+def delete_row(db: Session, table_name: str, rowid: int) -> None:
+    """
+    Remove the indexed copy of a row from an SQLite FTS5 table.
+    """
+    if dialect_name(db) != "sqlite" or not index_available(db, table_name):
+        return
+    db.execute(text(f"DELETE FROM {table_name} WHERE rowid = :rowid"), {"rowid": rowid})
+
+
+def delete_rows(db: Session, table_name: str, rowids: Iterable[int]) -> None:
+    """
+    Remove the indexed copies of several rows from an SQLite FTS5 table.
+    """
+    for rowid in rowids:
+        delete_row(db, table_name, rowid)
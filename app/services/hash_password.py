@@ -1,4 +1,106 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
 from passlib.context import CryptContext
+from app.core.config import settings
+
+pwd_context: CryptContext = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class HashPoolSaturated(Exception):
+    """
+    Raised when the password hashing pool already has its maximum number of pending jobs.
+    """
+
+
+class HashPool:
+    """
+    Size-limited executor for bcrypt work.
+
+    At most `max_pending` jobs may be running or queued at once; further submissions are
+    rejected immediately instead of piling up and pinning request threads.
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        """
+        Initialize the pool. Worker threads are started lazily on first use.
+
+        Args:
+            workers (int): Number of threads running bcrypt.
+            max_pending (int): Maximum number of running plus queued jobs.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def _run(self, fn: Callable, *args):
+        with self._lock:
+            self._active += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+        self._slots.release()
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """
+        Schedule a hashing job.
+
+        Raises:
+            HashPoolSaturated: If `max_pending` jobs are already running or queued.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashPoolSaturated()
+        with self._lock:
+            self._pending += 1
+        future = self._get_executor().submit(self._run, fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def run(self, fn: Callable, *args):
+        """
+        Run a hashing job on the pool and wait for its result.
+        """
+        return self.submit(fn, *args).result()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return queue depth and throughput counters of the pool.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "active": self._active,
+                "queued": self._pending - self._active,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+hash_pool = HashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
 
 class Hash:
     """
@@ -7,9 +109,10 @@ class Hash:
 
     def __init__(self) -> None:
         """
-        Initialize the password hashing context with bcrypt algorithm.
+        Bind to the shared password hashing context and worker pool.
         """
-        self.pwd_context: CryptContext = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.pwd_context: CryptContext = pwd_context
+        self.pool: HashPool = hash_pool
 
     def bcrypt(self, password: str) -> str:
         """
@@ -20,8 +123,14 @@ class Hash:
 
         Returns:
             str: The hashed password.
+
+        Raises:
+            HashPoolSaturated: If the hashing pool is full.
         """
-        return self.pwd_context.hash(password)
-    
+        return self.pool.run(self.pwd_context.hash, password)
+
     def verify(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return self.pool.run(self.pwd_context.verify, plain_password, hashed_password)
+
+
+hasher = Hash()
@@ -0,0 +1,179 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, delete, or_, select, update
+from app.core.config import settings
+from app.db import dialects
+from app.db.session import SessionLocal
+from app.models.account import IdempotencyKey
+
+REPLAYED_HEADER = "Idempotency-Replayed"
+
+# A key still marked as running after this long belongs to a request that died; it can be claimed again.
+PENDING_TIMEOUT_SECONDS = 60
+
+_purge_lock = threading.Lock()
+_last_purge = 0.0
+
+
+class IdempotencyError(Exception):
+    """
+    Base class of the errors raised for a request whose Idempotency-Key cannot be honoured.
+    """
+    status_code = 409
+
+
+class IdempotencyKeyInProgress(IdempotencyError):
+    """
+    Raised when a request arrives while the first request with the same key is still running.
+    """
+    status_code = 409
+
+
+class IdempotencyKeyReused(IdempotencyError):
+    """
+    Raised when a key is sent again with a different request body.
+    """
+    status_code = 422
+
+
+def fingerprint(payload: Any) -> str:
+    encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _key_filter(scope: str, key: str):
+    return and_(IdempotencyKey.scope == scope, IdempotencyKey.key == key)
+
+
+def _purge_expired(db, now: datetime) -> None:
+    """
+    Delete expired keys, at most once per PENDING_TIMEOUT_SECONDS in each process.
+    """
+    global _last_purge
+    with _purge_lock:
+        if time.monotonic() - _last_purge < PENDING_TIMEOUT_SECONDS:
+            return
+        _last_purge = time.monotonic()
+    db.execute(delete(IdempotencyKey).where(
+        IdempotencyKey.created_at <= now - timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS)
+    ))
+
+
+def _claim(scope: str, key: str, request_fingerprint: str):
+    """
+    Claim a key for this request, or return the record of the request that already holds it.
+
+    Returns:
+        Row or None: (fingerprint, status_code, body) of the existing record, None if the key was claimed.
+    """
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        _purge_expired(db, now)
+        # Free this key if its record expired or its first request never finished.
+        db.execute(delete(IdempotencyKey).where(
+            _key_filter(scope, key),
+            or_(
+                IdempotencyKey.created_at <= now - timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+                and_(
+                    IdempotencyKey.status_code.is_(None),
+                    IdempotencyKey.created_at <= now - timedelta(seconds=PENDING_TIMEOUT_SECONDS),
+                ),
+            ),
+        ))
+        claimed = db.execute(
+            dialects.insert_ignore(db, IdempotencyKey.__table__, ["scope", "key"])
+            .values(scope=scope, key=key, fingerprint=request_fingerprint, created_at=now)
+            .returning(IdempotencyKey.id)
+        ).first()
+        existing = None
+        if claimed is None:
+            existing = db.execute(
+                select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.body)
+                .where(_key_filter(scope, key))
+            ).first()
+        db.commit()
+        return existing
+    finally:
+        db.close()
+
+
+def _finish(scope: str, key: str, status_code: int, body: Any) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(IdempotencyKey)
+            .where(_key_filter(scope, key))
+            .values(status_code=status_code, body=json.dumps(jsonable_encoder(body)))
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _release(scope: str, key: str) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(delete(IdempotencyKey).where(_key_filter(scope, key)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(scope: str, key: Optional[str], payload: Any, status_code: int, handler: Callable[[], Any]) -> Any:
+    """
+    Run `handler` once per Idempotency-Key and replay its outcome to retries.
+
+    Without a key the handler simply runs. The first request with a key claims it in the
+    idempotency_keys table, so retries reaching any worker see it. A retry with the same key
+    and body gets the stored response back, with an `Idempotency-Replayed: true` header,
+    instead of running the handler again. Client errors (4xx) are stored and replayed like
+    successes; server errors release the key so the request can be retried. Outcomes are kept
+    for IDEMPOTENCY_TTL_SECONDS.
+
+    Args:
+        scope (str): Owner of the key, e.g. "<user id>:<route>", so keys of different clients never collide.
+        key (Optional[str]): The Idempotency-Key header value.
+        payload (Any): The request body, compared to detect a key reused for a different request.
+        status_code (int): Status code of the response produced by `handler`.
+        handler (Callable[[], Any]): Produces the response body, or raises HTTPException.
+
+    Returns:
+        Any: The handler's result, or a JSONResponse replaying the stored outcome.
+
+    Raises:
+        IdempotencyKeyInProgress: The first request with this key has not finished yet.
+        IdempotencyKeyReused: The key was used before with a different body.
+    """
+    if not key:
+        return handler()
+
+    request_fingerprint = fingerprint(payload)
+    existing = _claim(scope, key, request_fingerprint)
+    if existing is not None:
+        if existing.fingerprint != request_fingerprint:
+            raise IdempotencyKeyReused("Idempotency-Key was already used with a different request body.")
+        if existing.status_code is None:
+            raise IdempotencyKeyInProgress("A request with this Idempotency-Key is still being processed.")
+        return JSONResponse(json.loads(existing.body), status_code=existing.status_code, headers={REPLAYED_HEADER: "true"})
+
+    try:
+        result = handler()
+    except HTTPException as exc:
+        if exc.status_code < 500:
+            _finish(scope, key, exc.status_code, {"detail": exc.detail})
+        else:
+            _release(scope, key)
+        raise
+    except BaseException:
+        _release(scope, key)
+        raise
+    _finish(scope, key, status_code, result)
+    return result
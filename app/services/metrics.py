@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from typing import Dict, Tuple
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+
+from app.core.config import settings
+from app.db import query_stats
+
+# Multiprocess mode is enabled by starting every worker with PROMETHEUS_MULTIPROC_DIR set
+# (to an empty directory). Each worker then writes its samples to files in that directory
+# and /metrics, served by any worker, aggregates all of them.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status code.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request by route template.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+ROUTE_DB_SECONDS = Counter(
+    "http_request_db_seconds_total",
+    "Time spent running SQL statements by route template.",
+    ["method", "route"],
+)
+ROUTE_N_PLUS_ONE = Counter(
+    "http_request_n_plus_one_total",
+    "Requests that repeated a statement like an N+1 pattern, by route template.",
+    ["method", "route"],
+)
+ROUTE_OVER_BUDGET = Counter(
+    "http_request_query_budget_exceeded_total",
+    "Requests that ran more statements than their query budget, by route template.",
+    ["method", "route"],
+)
+
+OTP_ISSUED = Counter("otp_issued_total", "One-time passwords issued.")
+
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured connections in the primary pool.", multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out.", multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Overflow connections currently open.", multiprocess_mode="livesum")
+DB_POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Successful connection checkouts.")
+DB_POOL_TIMEOUTS = Counter("db_pool_checkout_timeouts_total", "Connection checkouts that timed out.")
+DB_POOL_WAIT = Counter("db_pool_checkout_wait_seconds_total", "Time spent waiting for connection checkouts.")
+DB_REPLICAS_HEALTHY = Gauge("db_replicas_healthy", "Read replicas currently in rotation.", multiprocess_mode="livemin")
+
+HASH_POOL_ACTIVE = Gauge("hash_pool_active", "bcrypt jobs currently running.", multiprocess_mode="livesum")
+HASH_POOL_QUEUED = Gauge("hash_pool_queued", "bcrypt jobs waiting for a worker thread.", multiprocess_mode="livesum")
+HASH_POOL_COMPLETED = Counter("hash_pool_completed_total", "bcrypt jobs completed.")
+HASH_POOL_REJECTED = Counter("hash_pool_rejected_total", "bcrypt jobs rejected because the pool was full.")
+
+CACHE_HITS = Counter("cache_hits_total", "In-process cache hits.", ["cache"])
+CACHE_MISSES = Counter("cache_misses_total", "In-process cache misses.", ["cache"])
+CACHE_ENTRIES = Gauge("cache_entries", "Entries currently held by in-process caches.", ["cache"], multiprocess_mode="livesum")
+
+_lock = threading.Lock()
+_last_refresh = 0.0
+# Last values seen of the process-local monotonic counters, to export them as increments.
+_previous: Dict[Tuple[str, ...], float] = {}
+
+
+def _increment(counter: Counter, key: Tuple[str, ...], value: float) -> None:
+    delta = value - _previous.get(key, 0)
+    if delta > 0:
+        counter.inc(delta)
+    _previous[key] = value
+
+
+def refresh(force: bool = False) -> None:
+    """
+    Copy this process's pool, hashing, cache and per-route query statistics into the exported metrics.
+
+    Runs at most once per METRICS_REFRESH_SECONDS per process unless forced, so that every
+    worker keeps its own samples current for multiprocess aggregation.
+    """
+    global _last_refresh
+    now = time.monotonic()
+    if not force and now - _last_refresh < settings.METRICS_REFRESH_SECONDS:
+        return
+    if not _lock.acquire(blocking=False):
+        return
+    try:
+        _last_refresh = now
+        from app.db.pool import pool_stats
+        from app.db.session import engine
+        from app.db import replicas
+        from app.services.cache import all_caches
+        from app.services.hash_password import hash_pool
+
+        pool = pool_stats(engine.pool)
+        DB_POOL_SIZE.set(pool.get("size", 0))
+        DB_POOL_CHECKED_OUT.set(pool.get("checked_out", 0))
+        DB_POOL_OVERFLOW.set(pool.get("overflow", 0))
+        _increment(DB_POOL_CHECKOUTS, ("pool", "checkouts"), pool["checkouts"])
+        _increment(DB_POOL_TIMEOUTS, ("pool", "timeouts"), pool["timeouts"])
+        _increment(DB_POOL_WAIT, ("pool", "wait"), pool["wait_seconds_total"])
+        if replicas.replica_set is not None:
+            DB_REPLICAS_HEALTHY.set(replicas.replica_set.healthy_count())
+
+        hashing = hash_pool.stats()
+        HASH_POOL_ACTIVE.set(hashing["active"])
+        HASH_POOL_QUEUED.set(hashing["queued"])
+        _increment(HASH_POOL_COMPLETED, ("hash", "completed"), hashing["completed"])
+        _increment(HASH_POOL_REJECTED, ("hash", "rejected"), hashing["rejected"])
+
+        for name, cache in all_caches().items():
+            stats = cache.stats()
+            _increment(CACHE_HITS.labels(name), ("cache_hits", name), stats["hits"])
+            _increment(CACHE_MISSES.labels(name), ("cache_misses", name), stats["misses"])
+            CACHE_ENTRIES.labels(name).set(stats["size"])
+
+        for (method, route), totals in query_stats.route_totals.snapshot().items():
+            if route == "/metrics":
+                continue
+            _increment(ROUTE_DB_SECONDS.labels(method, route), ("db_seconds", method, route), totals["db_seconds"])
+            _increment(ROUTE_N_PLUS_ONE.labels(method, route), ("n_plus_one", method, route), totals["n_plus_one"])
+            _increment(ROUTE_OVER_BUDGET.labels(method, route), ("over_budget", method, route), totals["over_budget"])
+    finally:
+        _lock.release()
+
+
+def render() -> Tuple[bytes, str]:
+    """
+    Serialize all metrics in the Prometheus text format, aggregated over workers in multiprocess mode.
+    """
+    refresh(force=True)
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """
+    Drop this worker's live gauges from the multiprocess files when it shuts down.
+    """
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware observing request latency and SQL statement counts per route template.
+
+    Requests that match no route are reported under route="unmatched" to keep label
+    cardinality bounded.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            if route_path != "/metrics":
+                REQUEST_LATENCY.labels(scope["method"], route_path, str(status["code"])).observe(
+                    time.perf_counter() - started
+                )
+                stats = query_stats.current_stats()
+                if stats is not None:
+                    REQUEST_DB_QUERIES.labels(scope["method"], route_path).observe(stats.count)
+            refresh()
@@ -0,0 +1,271 @@
+import json
+import logging
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, Optional, Tuple
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.db import dialects
+from app.db.session import SessionLocal
+from app.models.account import OtpCode
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class OtpCheck(str, Enum):
+    """
+    Outcome of consuming a one-time password.
+    """
+    VALID = "valid"
+    MISSING = "missing"
+    MISMATCH = "mismatch"
+    EXPIRED = "expired"
+
+
+@dataclass
+class OtpResult:
+    """
+    Outcome of consuming a challenge, with its email and data when the code was accepted or expired.
+    """
+    check: OtpCheck
+    email: Optional[str] = None
+    data: Optional[dict] = None
+
+
+def new_challenge_id() -> str:
+    return secrets.token_urlsafe(24)
+
+
+class OtpStore(ABC):
+    """
+    Storage for one-time password challenges.
+
+    Each challenge has a random id returned to the client, the email the code was sent to,
+    the code and optional data kept server-side until the code is verified. Issuing a code
+    replaces any earlier challenge for the same email in a single operation. A valid code
+    is deleted by the same operation that checks it, so it can only be used once.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+
+    @abstractmethod
+    def issue(self, email: str, code: str, data: Optional[dict] = None) -> str:
+        """
+        Store a challenge for an email, replacing the previous one, and return its id.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def consume(self, challenge_id: str, email: str, code: str) -> OtpResult:
+        """
+        Check a code and delete its challenge when it is valid; expired challenges are deleted too.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """
+        Delete expired challenges and return how many were removed.
+        """
+        raise NotImplementedError
+
+
+class MemoryOtpStore(OtpStore):
+    """
+    Challenges kept in this process only; suited to a single worker.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        super().__init__(ttl)
+        self._lock = threading.Lock()
+        # challenge id -> (email, code, expires_at, data)
+        self._challenges: Dict[str, Tuple[str, str, float, Optional[dict]]] = {}
+        self._by_email: Dict[str, str] = {}
+
+    def issue(self, email: str, code: str, data: Optional[dict] = None) -> str:
+        challenge_id = new_challenge_id()
+        with self._lock:
+            self._challenges.pop(self._by_email.get(email), None)
+            self._challenges[challenge_id] = (email, code, time.monotonic() + self.ttl, data)
+            self._by_email[email] = challenge_id
+        return challenge_id
+
+    def consume(self, challenge_id: str, email: str, code: str) -> OtpResult:
+        with self._lock:
+            entry = self._challenges.get(challenge_id)
+            if entry is None or entry[0] != email:
+                return OtpResult(OtpCheck.MISSING)
+            _, stored, expires_at, data = entry
+            if stored != code:
+                return OtpResult(OtpCheck.MISMATCH)
+            del self._challenges[challenge_id]
+            self._by_email.pop(email, None)
+        check = OtpCheck.VALID if expires_at > time.monotonic() else OtpCheck.EXPIRED
+        return OtpResult(check, email, data)
+
+    def sweep(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, entry in self._challenges.items() if entry[2] <= now]
+            for key in expired:
+                email = self._challenges.pop(key)[0]
+                if self._by_email.get(email) == key:
+                    del self._by_email[email]
+        return len(expired)
+
+
+class SqliteOtpStore(OtpStore):
+    """
+    Challenges kept in a local SQLite file, shared by all workers on the same host.
+    """
+
+    def __init__(self, ttl: float, path: str) -> None:
+        super().__init__(ttl)
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS otp_challenges (email TEXT PRIMARY KEY, challenge_id TEXT NOT NULL UNIQUE, "
+                "code TEXT NOT NULL, data TEXT, expires_at REAL NOT NULL)"
+            )
+            self._local.connection = connection
+        return connection
+
+    def issue(self, email: str, code: str, data: Optional[dict] = None) -> str:
+        challenge_id = new_challenge_id()
+        self._connection().execute(
+            "INSERT INTO otp_challenges (email, challenge_id, code, data, expires_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (email) DO UPDATE SET challenge_id = excluded.challenge_id, code = excluded.code, "
+            "data = excluded.data, expires_at = excluded.expires_at",
+            (email, challenge_id, code, json.dumps(data), time.time() + self.ttl),
+        )
+        return challenge_id
+
+    def consume(self, challenge_id: str, email: str, code: str) -> OtpResult:
+        connection = self._connection()
+        consumed = connection.execute(
+            "DELETE FROM otp_challenges WHERE challenge_id = ? AND email = ? AND code = ? RETURNING data, expires_at",
+            (challenge_id, email, code),
+        ).fetchone()
+        if consumed is not None:
+            check = OtpCheck.VALID if consumed[1] > time.time() else OtpCheck.EXPIRED
+            return OtpResult(check, email, json.loads(consumed[0]))
+        exists = connection.execute(
+            "SELECT 1 FROM otp_challenges WHERE challenge_id = ? AND email = ?", (challenge_id, email)
+        ).fetchone()
+        return OtpResult(OtpCheck.MISMATCH if exists else OtpCheck.MISSING)
+
+    def sweep(self) -> int:
+        return self._connection().execute("DELETE FROM otp_challenges WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+class DatabaseOtpStore(OtpStore):
+    """
+    Challenges kept in the otp_codes table of the main database, shared by every worker.
+    """
+
+    def issue(self, email: str, code: str, data: Optional[dict] = None) -> str:
+        challenge_id = new_challenge_id()
+        db = SessionLocal()
+        try:
+            db.execute(dialects.upsert(
+                db, OtpCode.__table__,
+                {"email": email, "challenge_id": challenge_id, "code": code, "data": json.dumps(data), "created_at": datetime.utcnow()},
+                index_elements=["email"],
+                update=["challenge_id", "code", "data", "created_at"],
+            ))
+            db.commit()
+        finally:
+            db.close()
+        return challenge_id
+
+    def consume(self, challenge_id: str, email: str, code: str) -> OtpResult:
+        db = SessionLocal()
+        try:
+            consumed = db.execute(
+                delete(OtpCode)
+                .where(OtpCode.challenge_id == challenge_id, OtpCode.email == email, OtpCode.code == code)
+                .returning(OtpCode.data, OtpCode.created_at)
+            ).first()
+            db.commit()
+            if consumed is not None:
+                expired = consumed.created_at <= datetime.utcnow() - timedelta(seconds=self.ttl)
+                return OtpResult(OtpCheck.EXPIRED if expired else OtpCheck.VALID, email, json.loads(consumed.data or "null"))
+            exists = db.query(OtpCode.id).filter(OtpCode.challenge_id == challenge_id, OtpCode.email == email).first()
+            return OtpResult(OtpCheck.MISMATCH if exists else OtpCheck.MISSING)
+        finally:
+            db.close()
+
+    def sweep(self) -> int:
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl)
+            removed = db.execute(delete(OtpCode).where(OtpCode.created_at <= cutoff)).rowcount
+            db.commit()
+            return removed
+        finally:
+            db.close()
+
+
+def create_otp_store(kind: str) -> OtpStore:
+    """
+    Create the OTP store selected by the OTP_STORE setting.
+    """
+    if kind == "memory":
+        return MemoryOtpStore(settings.OTP_TTL_SECONDS)
+    if kind == "sqlite":
+        return SqliteOtpStore(settings.OTP_TTL_SECONDS, settings.OTP_SQLITE_PATH)
+    return DatabaseOtpStore(settings.OTP_TTL_SECONDS)
+
+
+otp_store = create_otp_store(settings.OTP_STORE)
+
+_sweeper: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def _sweep_forever(store: OtpStore, interval: float) -> None:
+    while not _stop.wait(interval):
+        try:
+            store.sweep()
+        except Exception:
+            logger.exception("Sweeping expired OTP codes failed")
+
+
+def start_sweeper() -> None:
+    """
+    Start the background thread deleting expired codes every OTP_SWEEP_INTERVAL_SECONDS.
+    """
+    global _sweeper
+    if _sweeper is not None or settings.OTP_SWEEP_INTERVAL_SECONDS <= 0:
+        return
+    _stop.clear()
+    _sweeper = threading.Thread(
+        target=_sweep_forever, args=(otp_store, settings.OTP_SWEEP_INTERVAL_SECONDS), name="otp-sweeper", daemon=True
+    )
+    _sweeper.start()
+
+
+def stop_sweeper() -> None:
+    """
+    Stop the sweeper thread started by `start_sweeper`.
+    """
+    global _sweeper
+    if _sweeper is None:
+        return
+    _stop.set()
+    _sweeper.join(timeout=5)
+    _sweeper = None
@@ -0,0 +1,202 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+from fastapi import Request, Response
+from sqlalchemy import and_, false, or_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """
+    Raised when a pagination cursor cannot be decoded or does not match the requested ordering.
+    """
+
+
+def encode_cursor(values: Sequence) -> str:
+    """
+    Encode the ordering values of the last returned row as an opaque cursor.
+    """
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_values(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid pagination cursor.")
+    if not isinstance(values, list):
+        raise InvalidCursor("Invalid pagination cursor.")
+    return values
+
+
+def _cursor_value(column, value):
+    """
+    Check one decoded cursor value against the type of its ordering column.
+    """
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        python_type = None
+    if python_type is datetime:
+        if not isinstance(value, str):
+            raise InvalidCursor("Invalid pagination cursor.")
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            raise InvalidCursor("Invalid pagination cursor.")
+    # bool is a subclass of int, but a JSON true is never a valid integer key.
+    if isinstance(value, bool) and python_type is not bool:
+        raise InvalidCursor("Invalid pagination cursor.")
+    if python_type is float and isinstance(value, int):
+        return float(value)
+    if python_type is not None and not isinstance(value, python_type):
+        raise InvalidCursor("Invalid pagination cursor.")
+    if not isinstance(value, (str, int, float, bool)):
+        raise InvalidCursor("Invalid pagination cursor.")
+    return value
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    """
+    Decode a cursor back into values typed like the ordering columns.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed, has the wrong number of values, or a value
+            does not match the type of its column.
+    """
+    values = _decode_values(cursor)
+    if len(values) != len(columns):
+        raise InvalidCursor("Invalid pagination cursor.")
+    return [_cursor_value(column, value) for column, value in zip(columns, values)]
+
+
+def _nullable(column) -> bool:
+    return getattr(column, "nullable", True)
+
+
+def _ordering(column):
+    """
+    Order a nullable column with NULLs last on every backend, as Postgres does by default.
+    """
+    return column.asc().nulls_last() if _nullable(column) else column
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _greater(column, value):
+    """
+    Rows sorting after `value` in `column` with NULLs last, or None when nothing does.
+    """
+    if value is None:
+        return None
+    if _nullable(column):
+        return or_(column > value, column.is_(None))
+    return column > value
+
+
+def _after(columns: Sequence, values: Sequence):
+    """
+    Build `(c1, c2, ...) > (v1, v2, ...)` as nested OR/AND so it works on every backend.
+
+    NULLs sort after every value, matching `_ordering`, so a page ending on a NULL key can be continued.
+    """
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        greater = _greater(column, value)
+        if greater is not None:
+            clauses.append(and_(*[_equal(columns[j], values[j]) for j in range(i)], greater))
+    return or_(*clauses) if clauses else false()
+
+
+def keyset_page(
+    query: Query,
+    columns: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page of a query ordered by a unique key, seeking past the cursor instead of using OFFSET.
+
+    Args:
+        query (Query): Query returning ORM objects.
+        columns (Sequence): Ordering columns, the last of which must be unique (usually the primary key).
+            NULLs in nullable columns sort last.
+        limit (int): Page size.
+        cursor (Optional[str]): Cursor returned with the previous page.
+        skip (int): Legacy offset, only applied when no cursor is given.
+
+    Returns:
+        Tuple[List, Optional[str]]: The page of objects and the cursor of the next page, None on the last page.
+    """
+    query = query.order_by(*[_ordering(column) for column in columns])
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, columns)))
+    elif skip:
+        query = query.offset(skip)
+
+    items = query.limit(limit + 1).all()
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor([getattr(last, column.key) for column in columns])
+
+
+def is_offset_cursor(cursor: str) -> bool:
+    """
+    Check whether a cursor was produced by `offset_page`.
+    """
+    values = _decode_values(cursor)
+    return len(values) == 2 and values[0] == "offset"
+
+
+def offset_page(query: Query, limit: int, cursor: Optional[str] = None, skip: int = 0) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page of an already ordered query by position.
+
+    Used for relevance-ranked results, whose order has no unique key to seek on.
+
+    Returns:
+        Tuple[List, Optional[str]]: The page of objects and the cursor of the next page, None on the last page.
+    """
+    if cursor:
+        skip = decode_offset_cursor(cursor)
+
+    items = query.offset(skip).limit(limit + 1).all()
+    if len(items) <= limit:
+        return items, None
+    return items[:limit], encode_cursor(["offset", skip + limit])
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    """
+    Decode a cursor produced by `offset_page` into the number of rows to skip.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or is not an offset cursor.
+    """
+    values = _decode_values(cursor)
+    if len(values) != 2 or values[0] != "offset" or not isinstance(values[1], int) or values[1] < 0:
+        raise InvalidCursor("Invalid pagination cursor.")
+    return values[1]
+
+
+def page_response(request: Request, body: bytes, next_cursor: Optional[str]) -> Response:
+    """
+    Build a JSON list response advertising the next page through X-Next-Cursor and a Link header.
+    """
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return Response(content=body, media_type="application/json", headers=headers)
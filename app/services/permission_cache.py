@@ -0,0 +1,180 @@
+from typing import Dict, FrozenSet, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.account import Permission, role_permission, user_role
+from app.models.user import User
+from app.services.cache import create_cache
+
+# user_id -> (users.authz_version the roles were loaded at, frozenset of role ids)
+_user_roles = create_cache(
+    "user_roles",
+    maxsize=settings.PERMISSION_CACHE_MAX_SIZE,
+    ttl=settings.PERMISSION_CACHE_TTL_SECONDS,
+)
+
+# frozenset of role ids -> frozenset of permission names, shared by every user with the same roles
+_role_set_permissions = create_cache(
+    "role_permissions",
+    maxsize=settings.PERMISSION_CACHE_MAX_SIZE,
+    ttl=settings.PERMISSION_CACHE_TTL_SECONDS,
+)
+
+# "all" -> {permission name: permission id}, the bit positions used by token permission bitmaps
+_permission_ids = create_cache("permission_ids", maxsize=1, ttl=settings.PERMISSION_CACHE_TTL_SECONDS)
+
+# user_id -> users.authz_version, kept short-lived so other workers observe bumps quickly
+_authz_versions = create_cache(
+    "authz_versions",
+    maxsize=settings.PERMISSION_CACHE_MAX_SIZE,
+    ttl=settings.AUTHZ_VERSION_CACHE_TTL_SECONDS,
+)
+
+
+def get_user_role_ids(db: Session, user_id: int, authz_version: Optional[int] = None) -> FrozenSet[int]:
+    """
+    Get the ids of the roles assigned to a user, served from cache when warm.
+
+    A cached entry is only used while it was loaded at the user's current authz_version, which
+    every role or permission change bumps, so other workers pick up changes within
+    AUTHZ_VERSION_CACHE_TTL_SECONDS (or at once when the caller passes the version it just read).
+    Reloading a user's roles also drops the cached permissions of their role set.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): The ID of the user.
+        authz_version (Optional[int]): The user's authz_version if already loaded, e.g. from the user row.
+
+    Returns:
+        FrozenSet[int]: The user's role ids.
+    """
+    if authz_version is None:
+        authz_version = get_authz_version(db, user_id)
+    entry = _user_roles.get(user_id)
+    if entry is not None and entry[0] == authz_version:
+        return entry[1]
+    role_ids = frozenset(
+        role_id for (role_id,) in db.query(user_role.c.role_id).filter(user_role.c.user_id == user_id)
+    )
+    if entry is not None:
+        _role_set_permissions.pop(entry[1])
+    _role_set_permissions.pop(role_ids)
+    _user_roles.set(user_id, (authz_version, role_ids))
+    return role_ids
+
+
+def get_role_set_permissions(db: Session, role_ids: FrozenSet[int]) -> FrozenSet[str]:
+    """
+    Get the union of permission names granted by a set of roles, served from cache when warm.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        role_ids (FrozenSet[int]): The role ids to resolve.
+
+    Returns:
+        FrozenSet[str]: Names of all permissions granted by the roles.
+    """
+    if not role_ids:
+        return frozenset()
+    return _role_set_permissions.get_or_set(
+        role_ids,
+        lambda: frozenset(
+            name for (name,) in db.query(Permission.name)
+            .join(role_permission, role_permission.c.permission_id == Permission.id)
+            .filter(role_permission.c.role_id.in_(role_ids))
+            .distinct()
+        ),
+    )
+
+
+def get_user_permissions(db: Session, user_id: int, authz_version: Optional[int] = None) -> FrozenSet[str]:
+    """
+    Get the names of all permissions a user holds through their roles.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): The ID of the user.
+        authz_version (Optional[int]): The user's authz_version if already loaded, e.g. from the user row.
+
+    Returns:
+        FrozenSet[str]: Names of the user's permissions.
+    """
+    return get_role_set_permissions(db, get_user_role_ids(db, user_id, authz_version))
+
+
+def get_permission_ids(db: Session) -> Dict[str, int]:
+    """
+    Get the mapping of permission names to permission ids.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        Dict[str, int]: Permission ids keyed by permission name.
+    """
+    return _permission_ids.get_or_set(
+        "all",
+        lambda: {name: permission_id for permission_id, name in db.query(Permission.id, Permission.name)},
+    )
+
+
+def get_authz_version(db: Session, user_id: int) -> Optional[int]:
+    """
+    Get the current authorization version of a user, served from cache when warm.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user_id (int): The ID of the user.
+
+    Returns:
+        int or None: The user's authz_version, None if the user does not exist.
+    """
+    return _authz_versions.get_or_set(
+        user_id,
+        lambda: db.query(User.authz_version).filter(User.id == user_id).scalar(),
+    )
+
+
+def encode_permission_bitmap(permission_ids) -> str:
+    """
+    Encode permission ids as a hex bitmap where bit N is set when permission N is granted.
+    """
+    bitmap = 0
+    for permission_id in permission_ids:
+        bitmap |= 1 << permission_id
+    return format(bitmap, "x")
+
+
+def decode_permission_bitmap(db: Session, bitmap: str) -> FrozenSet[str]:
+    """
+    Decode a hex permission bitmap back into permission names.
+    """
+    bits = int(bitmap or "0", 16)
+    return frozenset(
+        name for name, permission_id in get_permission_ids(db).items() if bits >> permission_id & 1
+    )
+
+
+def invalidate_user(user_id: int) -> None:
+    """
+    Forget the cached roles and authz version of a user after their role assignments change.
+    """
+    _user_roles.pop(user_id)
+    _authz_versions.pop(user_id)
+
+
+def invalidate_role(role_id: int) -> None:
+    """
+    Forget every cached permission set that includes a role whose permissions changed.
+    """
+    _role_set_permissions.discard_where(lambda role_ids: role_id in role_ids)
+    _authz_versions.clear()
+
+
+def invalidate_all() -> None:
+    """
+    Forget all cached role and permission mappings.
+    """
+    _user_roles.clear()
+    _role_set_permissions.clear()
+    _permission_ids.clear()
+    _authz_versions.clear()
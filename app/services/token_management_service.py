@@ -6,6 +6,8 @@ import os
 from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.config import settings
+from app.services import permission_cache
 
 load_dotenv()
 
@@ -29,3 +31,34 @@ def create_access_token(data: Dict[str, str], expires_delta: Optional[timedelta]
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+
+def create_user_access_token(db, user) -> str:
+    """
+    Create a JWT access token for a user.
+
+    When `ACCESS_TOKEN_EMBED_AUTHZ` is enabled the token also carries the user id (`uid`),
+    role ids (`rid`), a hex permission bitmap indexed by permission id (`pm`) and the user's
+    `authz_version` (`av`), so requests can be authorized without loading the user row.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        user (User): The user the token is issued for.
+
+    Returns:
+        str: The encoded JWT token.
+    """
+    data = {"sub": user.email}
+    if settings.ACCESS_TOKEN_EMBED_AUTHZ:
+        permission_ids = permission_cache.get_permission_ids(db)
+        authz_version = user.authz_version or 0
+        data.update({
+            "uid": user.id,
+            "rid": sorted(permission_cache.get_user_role_ids(db, user.id, authz_version)),
+            "pm": permission_cache.encode_permission_bitmap(
+                permission_ids[name] for name in permission_cache.get_user_permissions(db, user.id, authz_version)
+                if name in permission_ids
+            ),
+            "av": authz_version,
+        })
+    return create_access_token(data=data)
@@ -0,0 +1,8 @@
+"""
+Load tests and benchmarks for the Edu Platform API.
+
+- `python -m benchmarks.seed` fills the configured database with synthetic data.
+- `python -m benchmarks.run` drives the API with the scenarios in `benchmarks.scenarios`,
+  either in-process or against a running server, and writes the results as JSON.
+- `python -m benchmarks.compare` compares two result files, e.g. from two commits.
+"""
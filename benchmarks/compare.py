@@ -0,0 +1,83 @@
+"""
+Compare two benchmark result files, e.g. from the base branch and from a change.
+
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/change.json --fail-over 10
+
+Exits with status 1 when `--fail-over` is given and any scenario's p95 latency grew, or
+its throughput dropped, by more than that many percent.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# (label, path into a scenario result, whether higher is better)
+METRICS: List[Tuple[str, Tuple[str, ...], bool]] = [
+    ("throughput req/s", ("throughput_rps",), True),
+    ("p50 ms", ("latency_ms", "p50"), False),
+    ("p95 ms", ("latency_ms", "p95"), False),
+    ("p99 ms", ("latency_ms", "p99"), False),
+    ("queries/request", ("queries_per_request", "mean"), False),
+    ("errors", ("errors",), False),
+]
+GATED = {"throughput req/s", "p95 ms"}
+
+
+def _get(result: Dict, path: Tuple[str, ...]) -> Optional[float]:
+    value = result
+    for key in path:
+        if not isinstance(value, dict) or value.get(key) is None:
+            return None
+        value = value[key]
+    return value
+
+
+def _change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if old is None or new is None or old == 0:
+        return None
+    return (new - old) / old * 100
+
+
+def compare(base: Dict, head: Dict, fail_over: Optional[float] = None) -> List[str]:
+    """
+    Print a table of every metric per scenario and return the regressions above `fail_over` percent.
+    """
+    regressions = []
+    print(f"base: {base['meta'].get('commit')} ({base['meta'].get('timestamp')})")
+    print(f"head: {head['meta'].get('commit')} ({head['meta'].get('timestamp')})")
+    for name in sorted(set(base["scenarios"]) | set(head["scenarios"])):
+        print(f"\n{name}")
+        if name not in base["scenarios"] or name not in head["scenarios"]:
+            print("  only in one of the files")
+            continue
+        for label, path, higher_is_better in METRICS:
+            old, new = _get(base["scenarios"][name], path), _get(head["scenarios"][name], path)
+            change = _change(old, new)
+            shown = f"{change:+.1f}%" if change is not None else ""
+            print(f"  {label:<18} {str(old):>12} -> {str(new):<12} {shown}")
+            if fail_over is not None and change is not None and label in GATED:
+                worse = -change if higher_is_better else change
+                if worse > fail_over:
+                    regressions.append(f"{name}: {label} {shown}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--fail-over", type=float, help="fail on p95/throughput regressions above this percentage")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    regressions = compare(base, head, args.fail_over)
+    if regressions:
+        print("\nRegressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
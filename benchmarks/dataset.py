@@ -0,0 +1,80 @@
+import json
+import os
+from dataclasses import asdict, dataclass, fields
+from typing import List
+
+# Every seeded user (including the admin) can log in with this password.
+PASSWORD = "bench-password"
+ADMIN_EMAIL = "bench-admin@example.com"
+ADMIN_ROLE = "Bench Admin"
+ADMIN_PERMISSIONS = [
+    "view_users",
+    "create_users",
+    "edit_users",
+    "delete_users",
+    "manage_users",
+    "manage_user_roles",
+    "manage_courses",
+    "manage_chapters",
+    "manage_lectures",
+]
+
+
+@dataclass
+class SeedConfig:
+    """
+    Volumes of synthetic data, saved next to the database so the scenario runner can
+    derive slugs, emails and enrollments without querying it.
+
+    Names are deterministic: course `i` has slug `bench-course-<i>`, its chapter `j` has
+    `bench-chapter-<i>-<j>` and that chapter's lecture `k` has `bench-lecture-<i>-<j>-<k>`.
+    Every fifth course and the first lecture of every chapter are free.
+    """
+    users: int = 1000
+    courses: int = 50
+    chapters_per_course: int = 8
+    lectures_per_chapter: int = 10
+    enrollments_per_user: int = 3
+    roles: int = 5
+    permissions: int = 20
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(asdict(self), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "SeedConfig":
+        with open(path) as f:
+            data = json.load(f)
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+    def user_email(self, n: int) -> str:
+        return f"bench-user-{n}@example.com"
+
+    def user_name(self, n: int) -> str:
+        return f"benchuser{n}"
+
+    def course_slug(self, i: int) -> str:
+        return f"bench-course-{i}"
+
+    def chapter_slug(self, i: int, j: int) -> str:
+        return f"bench-chapter-{i}-{j}"
+
+    def lecture_slug(self, i: int, j: int, k: int) -> str:
+        return f"bench-lecture-{i}-{j}-{k}"
+
+    def course_is_free(self, i: int) -> bool:
+        return i % 5 == 0
+
+    def lecture_is_free(self, k: int) -> bool:
+        return k == 0
+
+    def enrolled_courses(self, n: int) -> List[int]:
+        """
+        Get the indexes of the courses user `n` is enrolled in, which always include `n % courses`.
+        """
+        count = min(self.enrollments_per_user, self.courses)
+        stride = max(self.courses // max(count, 1), 1)
+        return sorted({(n + step * stride) % self.courses for step in range(count)})
@@ -0,0 +1,190 @@
+"""
+Drive the API with benchmark scenarios and save the results as JSON.
+
+    # In-process, through the ASGI app and the database configured by DATABASE_URL
+    python -m benchmarks.run --requests 2000 --concurrency 16
+
+    # Against a running server (start it with QUERY_DEBUG_HEADERS=true for query counts)
+    python -m benchmarks.run --base-url http://localhost:8000 --scenario catalog_browse
+
+Compare two result files with `python -m benchmarks.compare`.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.dataset import SeedConfig
+from benchmarks.scenarios import SCENARIOS, Context, Scenario, prepare_context
+
+
+@dataclass
+class Sample:
+    seconds: float
+    status: int
+    queries: Optional[int]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of already sorted values.
+    """
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))
+    return values[index]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict:
+    latencies = sorted(sample.seconds * 1000 for sample in samples)
+    queries = sorted(sample.queries for sample in samples if sample.queries is not None)
+    statuses: Dict[str, int] = {}
+    for sample in samples:
+        statuses[str(sample.status)] = statuses.get(str(sample.status), 0) + 1
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for sample in samples if sample.status >= 400),
+        "status_counts": statuses,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50), 3),
+            "p95": round(percentile(latencies, 0.95), 3),
+            "p99": round(percentile(latencies, 0.99), 3),
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+        "queries_per_request": {
+            "mean": round(sum(queries) / len(queries), 2),
+            "p95": percentile(queries, 0.95),
+            "max": queries[-1],
+        } if queries else None,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, ctx: Context, requests: int, concurrency: int, warmup: int, seed: int) -> Dict:
+    """
+    Send `requests` requests from `concurrency` concurrent workers after `warmup` untimed ones.
+    """
+    warmup_rng = random.Random(seed)
+    for _ in range(warmup):
+        await scenario.request(client, ctx, warmup_rng)
+
+    samples: List[Sample] = []
+    remaining = iter(range(requests))
+
+    async def worker(number: int) -> None:
+        rng = random.Random(seed * 1000 + number)
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await scenario.request(client, ctx, rng)
+            seconds = time.perf_counter() - started
+            count = response.headers.get("x-db-query-count")
+            samples.append(Sample(seconds, response.status_code, int(count) if count is not None else None))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    return summarize(samples, time.perf_counter() - started)
+
+
+@asynccontextmanager
+async def make_client(base_url: Optional[str]):
+    """
+    Yield an HTTP client for a running server, or for the in-process app with its lifespan running.
+    """
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            yield client
+        return
+
+    from app.core.config import settings
+    from app.main import app
+
+    # Query counts come from the X-DB-Query-Count header of QueryStatsMiddleware.
+    settings.QUERY_DEBUG_HEADERS = True
+    # Count unhandled errors as 500 responses, as a real server would, instead of aborting the run.
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            yield client
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> Dict:
+    config = SeedConfig.load(args.manifest)
+    scenarios = [SCENARIOS[name] for name in (args.scenario or list(SCENARIOS))]
+    results: Dict = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "mode": "http" if args.base_url else "in-process",
+            "base_url": args.base_url,
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "dataset": config.__dict__,
+        },
+        "scenarios": {},
+    }
+    async with make_client(args.base_url) as client:
+        ctx = await prepare_context(client, config, scenarios, args.students)
+        for scenario in scenarios:
+            print(f"Running {scenario.name} ({scenario.description})...")
+            result = await run_scenario(client, scenario, ctx, args.requests, args.concurrency, args.warmup, args.seed)
+            results["scenarios"][scenario.name] = result
+            latency = result["latency_ms"]
+            queries = result["queries_per_request"]
+            print(
+                f"  {result['throughput_rps']} req/s, p50 {latency['p50']} ms, p95 {latency['p95']} ms, "
+                f"p99 {latency['p99']} ms, errors {result['errors']}, "
+                f"queries/request {queries['mean'] if queries else 'n/a'}"
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the benchmark scenarios.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="scenario to run (repeatable, default: all)")
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20, help="untimed requests per scenario")
+    parser.add_argument("--students", type=int, default=10, help="students logged in for paid_lecture")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--manifest", default="benchmarks/results/seed.json", help="manifest written by benchmarks.seed")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>-<timestamp>.json)")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"{results['meta']['commit'] or 'local'}-{int(time.time())}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
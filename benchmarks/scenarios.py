@@ -0,0 +1,127 @@
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+import httpx
+
+from benchmarks.dataset import ADMIN_EMAIL, PASSWORD, SeedConfig
+
+API = "/api/v1"
+
+
+@dataclass
+class Context:
+    """
+    What scenarios need to build requests: the dataset volumes and pre-issued tokens.
+    """
+    config: SeedConfig
+    admin_token: Optional[str] = None
+    # Seeded user index -> access token.
+    student_tokens: Dict[int, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    A named workload; `request` sends one request chosen with `rng` and returns its response.
+    """
+    name: str
+    description: str
+    request: Callable[[httpx.AsyncClient, Context, random.Random], Awaitable[httpx.Response]]
+    needs_admin: bool = False
+    needs_students: bool = False
+
+
+def _bearer(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def login(client: httpx.AsyncClient, email: str) -> str:
+    """
+    Log a seeded user in and return their access token.
+
+    Raises:
+        RuntimeError: If the login fails, usually because the database was not seeded.
+    """
+    response = await client.post(f"{API}/accounts/login", json={"email": email, "password": PASSWORD})
+    token = response.json().get("token") if response.status_code == 200 else None
+    if not token:
+        raise RuntimeError(f"Could not log in as {email} ({response.status_code}): {response.text[:200]}")
+    return token
+
+
+async def catalog_browse(client: httpx.AsyncClient, ctx: Context, rng: random.Random) -> httpx.Response:
+    """
+    Anonymous visitor: course listing pages, course details, trees, chapter lectures and search.
+    """
+    config = ctx.config
+    i = rng.randrange(config.courses)
+    roll = rng.random()
+    if roll < 0.2:
+        return await client.get(f"{API}/courses", params={"limit": 20, "sort": "updated"})
+    if roll < 0.45:
+        return await client.get(f"{API}/courses/{config.course_slug(i)}")
+    if roll < 0.65:
+        return await client.get(f"{API}/courses/{config.course_slug(i)}/tree")
+    if roll < 0.85:
+        j = rng.randrange(config.chapters_per_course)
+        return await client.get(f"{API}/chapters/{config.chapter_slug(i, j)}/lectures")
+    return await client.get(f"{API}/search", params={"q": f"course {i}", "limit": 20})
+
+
+async def login_flow(client: httpx.AsyncClient, ctx: Context, rng: random.Random) -> httpx.Response:
+    """
+    Password login of a random seeded user; dominated by bcrypt.
+    """
+    n = rng.randrange(ctx.config.users)
+    return await client.post(f"{API}/accounts/login", json={"email": ctx.config.user_email(n), "password": PASSWORD})
+
+
+async def paid_lecture(client: httpx.AsyncClient, ctx: Context, rng: random.Random) -> httpx.Response:
+    """
+    Enrolled student opening a paid lecture, which checks the enrollment on every request.
+    """
+    config = ctx.config
+    n = rng.choice(list(ctx.student_tokens))
+    i = n % config.courses
+    j = rng.randrange(config.chapters_per_course)
+    k = rng.randrange(1, config.lectures_per_chapter)
+    return await client.get(f"{API}/lectures/{config.lecture_slug(i, j, k)}", headers=_bearer(ctx.student_tokens[n]))
+
+
+async def admin_user_search(client: httpx.AsyncClient, ctx: Context, rng: random.Random) -> httpx.Response:
+    """
+    Admin searching users by username prefix, as an autocomplete box would.
+    """
+    n = rng.randrange(ctx.config.users)
+    prefix = ctx.config.user_name(n)[:rng.randint(len("benchuser") + 1, len(ctx.config.user_name(n)))]
+    return await client.get(
+        f"{API}/users/users", params={"search": prefix, "limit": 20}, headers=_bearer(ctx.admin_token)
+    )
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("catalog_browse", "Anonymous catalog reads and search", catalog_browse),
+        Scenario("login", "Password login", login_flow),
+        Scenario("paid_lecture", "Enrolled student reading paid lectures", paid_lecture, needs_students=True),
+        Scenario("admin_user_search", "Admin user search", admin_user_search, needs_admin=True),
+    ]
+}
+
+
+async def prepare_context(client: httpx.AsyncClient, config: SeedConfig, scenarios: Iterable[Scenario], students: int) -> Context:
+    """
+    Log in the accounts the selected scenarios need, so token issuing stays out of their timings.
+    """
+    scenarios = list(scenarios)
+    ctx = Context(config=config)
+    if any(scenario.needs_admin for scenario in scenarios):
+        ctx.admin_token = await login(client, ADMIN_EMAIL)
+    if any(scenario.needs_students for scenario in scenarios):
+        if config.lectures_per_chapter < 2 or config.enrollments_per_user < 1:
+            raise RuntimeError("paid_lecture needs at least 2 lectures per chapter and 1 enrollment per user.")
+        for n in random.Random(0).sample(range(config.users), min(students, config.users)):
+            ctx.student_tokens[n] = await login(client, config.user_email(n))
+    return ctx
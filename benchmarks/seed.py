@@ -0,0 +1,276 @@
+"""
+Fill the configured database (DATABASE_URL) with synthetic benchmark data.
+
+    python -m benchmarks.seed --users 5000 --courses 100 --manifest benchmarks/results/seed.json
+
+The volumes are written to the manifest file, which `python -m benchmarks.run` reads to
+know which slugs, users and enrollments exist.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, time as clock_time
+from typing import Dict, Iterable, List
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal, engine
+from app.db.startup import prepare_database
+from app.models.account import Permission, Role, UserRegisteredCourse, role_permission, user_role
+from app.models.learning import Chapter, Course, Lecture
+from app.models.user import User
+from app.services import fulltext
+from app.services.hash_password import pwd_context
+from benchmarks.dataset import ADMIN_EMAIL, ADMIN_PERMISSIONS, ADMIN_ROLE, PASSWORD, SeedConfig
+
+BATCH_SIZE = 1000
+LANGUAGES = ["English", "Persian", "German", "French", "Spanish"]
+TOPICS = ["python", "fastapi", "databases", "algorithms", "networking", "design", "testing", "security"]
+
+# Rebuild the SQLite FTS5 copies of seeded rows; same expressions as the search migrations.
+FTS_REBUILD = {
+    "users_fts": (
+        "INSERT OR REPLACE INTO users_fts (rowid, email, username) "
+        "SELECT id, email, COALESCE(username, '') FROM users WHERE id > :after"
+    ),
+    "courses_fts": (
+        "INSERT OR REPLACE INTO courses_fts (rowid, title, full_name, description, lecturer, language) "
+        "SELECT id, COALESCE(title, ''), COALESCE(full_name, ''), COALESCE(description, ''), "
+        "COALESCE(lecturer, ''), COALESCE(language, '') FROM courses WHERE id > :after"
+    ),
+    "lectures_fts": (
+        "INSERT OR REPLACE INTO lectures_fts (rowid, title) "
+        "SELECT id, COALESCE(title, '') FROM lectures WHERE id > :after"
+    ),
+}
+FTS_CONTENT_TABLES = {"users_fts": User, "courses_fts": Course, "lectures_fts": Lecture}
+
+
+def _max_id(db: Session, model) -> int:
+    return db.query(func.max(model.id)).scalar() or 0
+
+
+def _insert(db: Session, table, rows: Iterable[Dict]) -> int:
+    """
+    Insert rows in batches of BATCH_SIZE with executemany, returning how many were inserted.
+    """
+    count = 0
+    batch: List[Dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            db.execute(insert(table), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(table), batch)
+        count += len(batch)
+    return count
+
+
+def _reset_sequences(db: Session, tables: Iterable[str]) -> None:
+    # Rows are inserted with explicit ids, so move Postgres sequences past them.
+    if fulltext.dialect_name(db) != "postgresql":
+        return
+    for table in tables:
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"
+        ))
+
+
+def seed(db: Session, config: SeedConfig, rng: random.Random) -> Dict[str, int]:
+    """
+    Insert the synthetic users, roles, permissions, catalog and enrollments described by `config`.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        config (SeedConfig): Volumes to generate.
+        rng (random.Random): Source of randomness, seeded for reproducible datasets.
+
+    Returns:
+        dict: Number of rows inserted per table.
+
+    Raises:
+        RuntimeError: If the database already contains benchmark data.
+    """
+    if db.query(User.id).filter(User.email == ADMIN_EMAIL).first() is not None:
+        raise RuntimeError("The database already contains benchmark data; seed a fresh database instead.")
+
+    now = datetime.utcnow()
+    inserted: Dict[str, int] = {}
+    first_id = {
+        "users": _max_id(db, User),
+        "courses": _max_id(db, Course),
+        "chapters": _max_id(db, Chapter),
+        "lectures": _max_id(db, Lecture),
+    }
+
+    # Permissions and roles: the admin role gets every permission the API checks, the
+    # synthetic roles get random subsets so permission lookups touch realistic join sizes.
+    existing = {name: id for id, name in db.query(Permission.id, Permission.name)}
+    names = [name for name in ADMIN_PERMISSIONS if name not in existing]
+    names += [f"bench_permission_{n}" for n in range(config.permissions)]
+    permission_base = _max_id(db, Permission)
+    permission_ids = dict(existing)
+    for offset, name in enumerate(names, start=1):
+        permission_ids[name] = permission_base + offset
+    inserted["permissions"] = _insert(db, Permission.__table__, ({"id": permission_ids[name], "name": name} for name in names))
+
+    role_base = _max_id(db, Role)
+    role_names = [ADMIN_ROLE] + [f"Bench role {n}" for n in range(config.roles)]
+    role_ids = {name: role_base + offset for offset, name in enumerate(role_names, start=1)}
+    inserted["roles"] = _insert(db, Role.__table__, ({"id": role_ids[name], "name": name} for name in role_names))
+
+    synthetic_permissions = [permission_ids[f"bench_permission_{n}"] for n in range(config.permissions)]
+    grants = [{"role_id": role_ids[ADMIN_ROLE], "permission_id": permission_ids[name]} for name in ADMIN_PERMISSIONS]
+    for n in range(config.roles):
+        size = rng.randint(1, len(synthetic_permissions)) if synthetic_permissions else 0
+        for permission_id in rng.sample(synthetic_permissions, size):
+            grants.append({"role_id": role_ids[f"Bench role {n}"], "permission_id": permission_id})
+    inserted["role_permission"] = _insert(db, role_permission, grants)
+
+    # Users share one bcrypt hash: hashing per user would dominate the seeding time.
+    password_hash = pwd_context.hash(PASSWORD)
+    admin_id = first_id["users"] + config.users + 1
+
+    def users():
+        for n in range(config.users):
+            yield {
+                "id": first_id["users"] + n + 1,
+                "email": config.user_email(n),
+                "username": config.user_name(n),
+                "password": password_hash,
+                "is_registered": True,
+                "authz_version": 0,
+            }
+        yield {"id": admin_id, "email": ADMIN_EMAIL, "username": "benchadmin", "password": password_hash, "is_registered": True, "authz_version": 0}
+
+    inserted["users"] = _insert(db, User.__table__, users())
+
+    def memberships():
+        yield {"user_id": admin_id, "role_id": role_ids[ADMIN_ROLE]}
+        if config.roles:
+            for n in range(config.users):
+                yield {"user_id": first_id["users"] + n + 1, "role_id": role_ids[f"Bench role {n % config.roles}"]}
+
+    inserted["user_role"] = _insert(db, user_role, memberships())
+
+    # Catalog: courses -> chapters -> lectures, ids derived from the indexes.
+    def course_id(i):
+        return first_id["courses"] + i + 1
+
+    def chapter_id(i, j):
+        return first_id["chapters"] + i * config.chapters_per_course + j + 1
+
+    def lecture_id(i, j, k):
+        return first_id["lectures"] + (i * config.chapters_per_course + j) * config.lectures_per_chapter + k + 1
+
+    def courses():
+        for i in range(config.courses):
+            topic = rng.choice(TOPICS)
+            yield {
+                "id": course_id(i),
+                "title": f"Bench course {i} {topic}",
+                "full_name": f"Benchmark course {i}: {topic} from scratch",
+                "slug": config.course_slug(i),
+                "lecturer": f"Lecturer {rng.randint(1, 20)}",
+                "language": rng.choice(LANGUAGES),
+                "is_free": config.course_is_free(i),
+                "description": " ".join(rng.choice(TOPICS) for _ in range(30)),
+                "created_at": now,
+                "updated_at": now,
+            }
+
+    def chapters():
+        for i in range(config.courses):
+            for j in range(config.chapters_per_course):
+                yield {
+                    "id": chapter_id(i, j),
+                    "title": f"Chapter {j} of course {i}",
+                    "slug": config.chapter_slug(i, j),
+                    "is_free": config.course_is_free(i) or j == 0,
+                    "course_id": course_id(i),
+                    "updated_at": now,
+                }
+
+    def lectures():
+        for i in range(config.courses):
+            for j in range(config.chapters_per_course):
+                for k in range(config.lectures_per_chapter):
+                    yield {
+                        "id": lecture_id(i, j, k),
+                        "title": f"Lecture {k} {rng.choice(TOPICS)}",
+                        "slug": config.lecture_slug(i, j, k),
+                        "time": clock_time(0, rng.randint(3, 40), rng.randint(0, 59)),
+                        "is_free": config.lecture_is_free(k),
+                        "video_url": f"https://videos.example.com/{i}/{j}/{k}.mp4",
+                        "chapter_id": chapter_id(i, j),
+                        "course_id": course_id(i),
+                        "updated_at": now,
+                    }
+
+    inserted["courses"] = _insert(db, Course.__table__, courses())
+    inserted["chapters"] = _insert(db, Chapter.__table__, chapters())
+    inserted["lectures"] = _insert(db, Lecture.__table__, lectures())
+
+    def enrollments():
+        for n in range(config.users):
+            for i in config.enrolled_courses(n):
+                yield {"user_id": first_id["users"] + n + 1, "course_id": course_id(i), "registered_at": now}
+
+    inserted["user_registered_courses"] = _insert(db, UserRegisteredCourse.__table__, enrollments())
+
+    if fulltext.dialect_name(db) == "sqlite":
+        for table_name, statement in FTS_REBUILD.items():
+            if fulltext.index_available(db, table_name):
+                model = FTS_CONTENT_TABLES[table_name]
+                db.execute(text(statement), {"after": first_id[model.__tablename__]})
+    _reset_sequences(db, ["permissions", "roles", "users", "courses", "chapters", "lectures", "user_registered_courses"])
+
+    db.commit()
+    return inserted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fill the configured database with synthetic benchmark data.")
+    defaults = SeedConfig()
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--courses", type=int, default=defaults.courses)
+    parser.add_argument("--chapters-per-course", type=int, default=defaults.chapters_per_course)
+    parser.add_argument("--lectures-per-chapter", type=int, default=defaults.lectures_per_chapter)
+    parser.add_argument("--enrollments-per-user", type=int, default=defaults.enrollments_per_user)
+    parser.add_argument("--roles", type=int, default=defaults.roles)
+    parser.add_argument("--permissions", type=int, default=defaults.permissions)
+    parser.add_argument("--seed", type=int, default=42, help="random seed, for reproducible datasets")
+    parser.add_argument("--manifest", default="benchmarks/results/seed.json", help="where to write the dataset volumes")
+    parser.add_argument("--create-tables", action="store_true", help="create missing tables first (no search indexes)")
+    args = parser.parse_args()
+
+    config = SeedConfig(
+        users=args.users,
+        courses=args.courses,
+        chapters_per_course=args.chapters_per_course,
+        lectures_per_chapter=args.lectures_per_chapter,
+        enrollments_per_user=args.enrollments_per_user,
+        roles=args.roles,
+        permissions=args.permissions,
+    )
+    if args.create_tables:
+        prepare_database(engine, "create_all")
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        inserted = seed(db, config, random.Random(args.seed))
+    finally:
+        db.close()
+    config.save(args.manifest)
+
+    for table, count in inserted.items():
+        print(f"{table:>24}: {count}")
+    print(f"Seeded in {time.perf_counter() - started:.1f}s, manifest written to {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from app.models.learning import Course
+from app.services.pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_page
+
+
+@pytest.mark.parametrize("values", [
+    [{"x": 1}],
+    [[1, 2]],
+    ["abc"],
+    [True],
+    [1.5],
+    [1, 2],
+    [],
+])
+def test_decode_cursor_rejects_values_not_matching_the_key(values):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor(values), [Course.id])
+
+
+@pytest.mark.parametrize("cursor", ["not base64 !", "e30", "eyJ4IjogMX0"])
+def test_decode_cursor_rejects_malformed_cursors(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, [Course.id])
+
+
+@pytest.mark.parametrize("values", [[5, 1], ["yesterday", 1], [None, "1"]])
+def test_decode_cursor_rejects_bad_compound_values(values):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor(values), [Course.updated_at, Course.id])
+
+
+def test_decode_cursor_round_trips_key_values():
+    updated_at = datetime(2024, 5, 1, 12, 30)
+    assert decode_cursor(encode_cursor([updated_at, 42]), [Course.updated_at, Course.id]) == [updated_at, 42]
+    assert decode_cursor(encode_cursor([None, 42]), [Course.updated_at, Course.id]) == [None, 42]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Course.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def test_keyset_page_pages_across_null_keys(db):
+    updated = [datetime(2024, 1, 2), None, datetime(2024, 1, 1), None, datetime(2024, 1, 2), None]
+    db.add_all([Course(id=i, title=f"c{i}", updated_at=value) for i, value in enumerate(updated, start=1)])
+    db.flush()
+    # The column default fills in None on insert; rows from before the migration have NULL.
+    db.execute(update(Course).where(Course.id.in_([2, 4, 6])).values(updated_at=None))
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = keyset_page(db.query(Course), [Course.updated_at, Course.id], 2, cursor=cursor)
+        seen.extend(course.id for course in page)
+        if cursor is None:
+            break
+    assert seen == [3, 1, 5, 2, 4, 6]